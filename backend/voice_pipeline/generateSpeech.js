@@ -1,39 +1,122 @@
-import { spawnSync } from 'node:child_process';
+import { spawn } from 'node:child_process';
 import path from 'node:path';
+import readline from 'node:readline';
 import { fileURLToPath } from 'node:url';
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
 const repoRoot = path.resolve(__dirname, '..', '..');
 
-export function generateSpeech({ speaker, text, voice, turnId }) {
-  const audioPath = path.join(repoRoot, 'assets', 'voices', `${speaker}_${turnId}.wav`);
-  const lipsyncPath = path.join(repoRoot, 'assets', 'lipsync', `${speaker}_${turnId}.json`);
+const TTS_WORKERS = process.env.TTS_WORKERS || '2';
+const LIPSYNC_WORKERS = process.env.LIPSYNC_WORKERS || '2';
+const TTS_TIMEOUT_MS = Number(process.env.TTS_TIMEOUT_MS || 60000);
 
-  const tts = spawnSync('python3', [
-    path.join(repoRoot, 'services', 'tts', 'tts_service.py'),
-    '--text', text,
-    '--voice', voice || 'en',
-    '--output', audioPath,
-  ], { encoding: 'utf-8' });
+// A long-lived `<script> --serve` process: the engine is loaded once and
+// requests are sent as JSON lines, answered by id. A request may be answered
+// with several `chunk` replies before its final one. Audio and timelines land
+// in the content-addressed cache (services/media_cache.py), so repeated lines
+// are not synthesized again.
+class JsonLinesWorker {
+  constructor(name, script, workers) {
+    this.name = name;
+    this.script = script;
+    this.workers = workers;
+    this.proc = null;
+    this.pending = new Map();
+    this.nextId = 1;
+  }
+
+  start() {
+    const proc = spawn('python3', [this.script, '--serve', '--workers', this.workers],
+      { stdio: ['pipe', 'pipe', 'inherit'] });
+
+    readline.createInterface({ input: proc.stdout }).on('line', (line) => {
+      let reply;
+      try {
+        reply = JSON.parse(line);
+      } catch {
+        return;
+      }
+      const job = this.pending.get(reply.id);
+      if (!job) return;
+      if (reply.chunk !== undefined && !reply.error) {
+        job.onChunk(reply);
+        return;
+      }
+      this.pending.delete(reply.id);
+      clearTimeout(job.timer);
+      if (reply.error) job.reject(new Error(`${this.name} failed: ${reply.error}`));
+      else job.resolve(reply);
+    });
 
-  if (tts.status !== 0) {
-    throw new Error(`TTS failed: ${tts.stderr}`);
+    const fail = (error) => {
+      if (this.proc !== proc) return;
+      this.proc = null;
+      for (const job of this.pending.values()) {
+        clearTimeout(job.timer);
+        job.reject(new Error(`${this.name} failed: ${error}`));
+      }
+      this.pending.clear();
+    };
+    proc.on('exit', (code, signal) => fail(`worker exited (${signal || code})`));
+    proc.on('error', fail);
+    proc.stdin.on('error', () => {}); // reported through 'exit'
+
+    this.proc = proc;
   }
 
-  const lipsync = spawnSync('python3', [
-    path.join(repoRoot, 'services', 'lipsync', 'lipsync_service.py'),
-    '--audio', audioPath,
-    '--text', text,
-    '--output', lipsyncPath,
-  ], { encoding: 'utf-8' });
+  request(payload, onChunk = () => {}) {
+    if (!this.proc) this.start();
+    const id = this.nextId++;
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject(new Error(`${this.name} failed: timed out`));
+      }, TTS_TIMEOUT_MS);
+      this.pending.set(id, { resolve, reject, onChunk, timer });
+      this.proc.stdin.write(`${JSON.stringify({ id, ...payload })}\n`);
+    });
+  }
 
-  if (lipsync.status !== 0) {
-    throw new Error(`Lipsync failed: ${lipsync.stderr}`);
+  stop() {
+    if (this.proc) this.proc.stdin.end();
   }
+}
 
+export const ttsWorker = new JsonLinesWorker(
+  'TTS', path.join(repoRoot, 'services', 'tts', 'tts_service.py'), TTS_WORKERS);
+export const lipsyncWorker = new JsonLinesWorker(
+  'Lipsync', path.join(repoRoot, 'services', 'lipsync', 'lipsync_service.py'), LIPSYNC_WORKERS);
+
+async function withLipsync({ key, audio, text }) {
+  await lipsyncWorker.request({ key, audio, text });
   return {
-    audio: `/voices/${speaker}_${turnId}.wav`,
-    lipsync: `/lipsync/${speaker}_${turnId}.json`
+    audio: `/voices/${key}.wav`,
+    lipsync: `/lipsync/${key}.json`
   };
 }
+
+export async function generateSpeech({ text, voice }) {
+  const { key, audio } = await ttsWorker.request({ text, voice: voice || 'en' });
+  return withLipsync({ key, audio, text });
+}
+
+// Synthesizes `text` a sentence at a time. Each chunk's lipsync starts as soon
+// as its audio is ready, while the next sentence is being synthesized;
+// `onChunk({ index, chunks, text, audio, lipsync })` is called in order.
+// Resolves with all the chunks.
+export async function streamSpeech({ text, voice }, onChunk) {
+  const chunks = [];
+  let emitted = Promise.resolve();
+  await ttsWorker.request({ text, voice: voice || 'en', stream: true }, (reply) => {
+    const ready = withLipsync({ key: reply.key, audio: reply.audio, text: reply.text });
+    emitted = emitted.then(async () => {
+      const chunk = { index: reply.chunk, chunks: reply.chunks, text: reply.text, ...(await ready) };
+      chunks.push(chunk);
+      onChunk(chunk);
+    });
+    emitted.catch(() => {}); // surfaced by the await below
+  });
+  await emitted;
+  return chunks;
+}
@@ -6,12 +6,16 @@ import path from 'node:path';
 import { Server } from 'socket.io';
 import { fileURLToPath } from 'node:url';
 import { nextTurn } from '../conversation_engine/engine.js';
-import { generateSpeech } from '../voice_pipeline/generateSpeech.js';
+import { generateSpeech, streamSpeech } from '../voice_pipeline/generateSpeech.js';
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
 const repoRoot = path.resolve(__dirname, '..', '..');
 const registryPath = path.join(repoRoot, 'backend', 'data', 'agent_registry.json');
+// Turns are voiced sentence by sentence as conversation_chunk events, and the final
+// conversation_turn carries `chunks` instead of one audio/lipsync pair (see
+// client/src/world/turns.js). TTS_STREAMING=0 sends whole turns.
+const streaming = process.env.TTS_STREAMING !== '0';
 
 const app = express();
 app.use(cors());
@@ -25,10 +29,10 @@ app.get('/agent_registry', (req, res) => {
   return res.json(JSON.parse(fs.readFileSync(registryPath, 'utf-8')));
 });
 
-app.post('/tts', (req, res) => {
-  const { text, voice = 'en', speaker = 'agent', turnId = Date.now() } = req.body;
+app.post('/tts', async (req, res) => {
+  const { text, voice = 'en' } = req.body;
   try {
-    const out = generateSpeech({ speaker, text, voice, turnId });
+    const out = await generateSpeech({ text, voice });
     res.json(out);
   } catch (error) {
     res.status(500).json({ error: String(error) });
@@ -43,30 +47,46 @@ io.on('connection', (socket) => {
 });
 
 let turn = 0;
-setInterval(() => {
-  if (!fs.existsSync(registryPath)) return;
+let speaking = false;
+setInterval(async () => {
+  if (speaking || !fs.existsSync(registryPath)) return;
   const registry = JSON.parse(fs.readFileSync(registryPath, 'utf-8'));
   const payload = nextTurn(turn++);
   const cfg = registry[payload.speaker];
   if (!cfg) return;
 
-  const turnId = `${Date.now()}`;
+  speaking = true;
   try {
-    const speech = generateSpeech({
-      speaker: payload.speaker,
-      text: payload.text,
-      voice: cfg.voice,
-      turnId,
-    });
+    if (streaming) {
+      const turnId = `${Date.now()}`;
+      const started = Date.now();
+      io.emit('conversation_turn_start', { ...payload, turnId, seat: cfg.seat });
+      const chunks = await streamSpeech({ text: payload.text, voice: cfg.voice }, (chunk) => {
+        // Each chunk is playable on its own; the first one starts the avatar speaking.
+        io.emit('conversation_chunk', {
+          ...payload,
+          ...chunk,
+          turnId,
+          seat: cfg.seat,
+          elapsedMs: Date.now() - started,
+        });
+        if (chunk.index === 0) io.emit('agent_speaking', { speaker: payload.speaker });
+      });
+      io.emit('conversation_turn', { ...payload, turnId, seat: cfg.seat, chunks });
+    } else {
+      const speech = await generateSpeech({ text: payload.text, voice: cfg.voice });
 
-    io.emit('conversation_turn', {
-      ...payload,
-      ...speech,
-      seat: cfg.seat,
-    });
-    io.emit('agent_speaking', { speaker: payload.speaker });
+      io.emit('conversation_turn', {
+        ...payload,
+        ...speech,
+        seat: cfg.seat,
+      });
+      io.emit('agent_speaking', { speaker: payload.speaker });
+    }
   } catch (error) {
     console.error(error);
+  } finally {
+    speaking = false;
   }
 }, 9000);
 
@@ -6,25 +6,54 @@ const mouthMap = {
   mouthOpen: 1,
   mouthWide: 0.6,
   mouthRound: 0.8,
+  mouthClosed: 0,
 };
 
 export default function TalkingAvatar({ agent, speakingTurn, position, lookAt }) {
   const group = useRef();
   const [mouth, setMouth] = useState(0);
 
+  // Chunks of the current turn, played back to back as they arrive; a whole
+  // (non-streamed) turn is a single chunk. See world/turns.js.
+  const queue = useRef({ key: null, chunks: [], next: 0, playing: false });
+
   useEffect(() => {
     if (!speakingTurn || speakingTurn.speaker !== agent.id) return;
-    const audio = new Audio(`http://localhost:8788${speakingTurn.audio}`);
-    const run = async () => {
-      const res = await fetch(`http://localhost:8788${speakingTurn.lipsync}`);
-      const timeline = await res.json();
-      timeline.forEach((frame) => {
-        setTimeout(() => setMouth(mouthMap[frame.mouth] || 0.2), frame.time * 1000);
-      });
-      audio.onended = () => setMouth(0);
-      audio.play();
+    const key = speakingTurn.turnId ?? speakingTurn.audio;
+    if (queue.current.key !== key) {
+      queue.current = { key, chunks: [], next: 0, playing: false };
+    }
+    const q = queue.current;
+    q.chunks = speakingTurn.chunks
+      ?? (speakingTurn.audio ? [{ audio: speakingTurn.audio, lipsync: speakingTurn.lipsync }] : []);
+
+    const playNext = async () => {
+      if (q.playing || q.next >= q.chunks.length || queue.current !== q) return;
+      const chunk = q.chunks[q.next++];
+      q.playing = true;
+      const audio = new Audio(`http://localhost:8788${chunk.audio}`);
+      let done = false;
+      const finish = () => {
+        if (done) return;
+        done = true;
+        setMouth(0);
+        q.playing = false;
+        playNext();
+      };
+      audio.onended = finish;
+      audio.onerror = finish;
+      try {
+        const res = await fetch(`http://localhost:8788${chunk.lipsync}`);
+        const timeline = await res.json();
+        timeline.forEach((frame) => {
+          setTimeout(() => setMouth(mouthMap[frame.mouth] ?? 0.2), frame.time * 1000);
+        });
+        await audio.play();
+      } catch {
+        finish();
+      }
     };
-    run();
+    playNext();
   }, [speakingTurn, agent.id]);
 
   useEffect(() => {
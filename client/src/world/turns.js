@@ -0,0 +1,22 @@
+// Folds the world server's socket events into the `speakingTurn` that
+// TalkingAvatar plays. A streamed turn starts with `conversation_turn_start`,
+// grows one `conversation_chunk` (a sentence of audio + lipsync) at a time and
+// ends with `conversation_turn`; a whole turn is a single `conversation_turn`.
+export function applyTurnEvent(turn, event, data) {
+  switch (event) {
+    case 'conversation_turn_start':
+      return { ...data, chunks: [] };
+    case 'conversation_chunk': {
+      const { index, text, audio, lipsync } = data;
+      const base = turn?.turnId === data.turnId ? turn
+        : { speaker: data.speaker, emotion: data.emotion, seat: data.seat, turnId: data.turnId, chunks: [] };
+      const chunks = [...base.chunks];
+      chunks[index] = { index, text, audio, lipsync };
+      return { ...base, chunks };
+    }
+    case 'conversation_turn':
+      return data.chunks && turn?.turnId === data.turnId ? { ...turn, chunks: data.chunks } : data;
+    default:
+      return turn;
+  }
+}
@@ -1,12 +1,14 @@
 from database import *
 import urllib.parse
-from flask import jsonify,request,session,render_template,redirect,url_for,Blueprint
+from flask import jsonify,request,session,render_template,redirect,url_for,Blueprint,make_response,Response,stream_with_context,current_app
 from requests_oauthlib import OAuth2Session
 from flask_login import login_required, login_user, current_user, logout_user
 import secrets
 from datetime import datetime, date, timedelta, timezone
-import os, pickle, codecs
-from typing import List
+import os, json, queue, threading
+from typing import Iterator, List
+from langchain.callbacks.base import CallbackManager
+from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
 from langchain.chat_models import ChatOpenAI
 from langchain.prompts.chat import (
     SystemMessagePromptTemplate,
@@ -18,6 +20,12 @@ from langchain.schema import (
     SystemMessage,
     BaseMessage,
 )
+from camel_jobs import job_queue
+from history_policy import make_history_policy
+from llm_clients import DEFAULT_MODEL, get_chat_model
+from specifier_cache import cache_key, specifier_cache
+from search_index import search_index
+from session_store import chat_rows, chat_version, history_states, load_histories, save_turn
 
 authorization_base_url = "https://accounts.google.com/o/oauth2/v2/auth"
 scope = [
@@ -39,6 +47,7 @@ if not google_client_id or not google_client_secret:
     print("See server/.env.example for reference.")
     print("=" * 60)
 word_limit = 50 # word limit for task brainstorming
+CAMEL_JOB_MAX_TURNS = int(os.environ.get("CAMEL_JOB_MAX_TURNS", "50")) # cap for /rp/jobs runs
 
 rp = Blueprint('rp', __name__)
 
@@ -97,22 +106,39 @@ def rp_google_callback():
     login_user(getAdmin, remember=True)
     return redirect("http://localhost:3000/")
 
+class _TokenQueueHandler(StreamingStdOutCallbackHandler):
+    """Puts streamed tokens on a queue instead of writing them to stdout."""
+
+    def __init__(self, tokens: queue.Queue) -> None:
+        self.tokens = tokens
+
+    @property
+    def always_verbose(self) -> bool:
+        return True
+
+    def on_llm_new_token(self, token: str, **kwargs) -> None:
+        self.tokens.put(token)
+
 class CAMELAgent:
 
     def __init__(
         self,
         system_message,
         model: ChatOpenAI,
-        store
+        store,
+        history_policy=None,
     ) -> None:
         self.model = model
+        self.history_policy = history_policy if history_policy is not None else make_history_policy(model=model)
         if store == None:
             self.system_message = system_message
             self.init_messages()
+            self.saved_count = 0
             # print("NEW")
         else:
             self.stored_messages = store
             self.system_message = store[0]
+            self.saved_count = len(store)
             # print("MESSAGES \n",self.stored_messages,"\n SYSTEM MESSAGE \n",self.system_message)
 
     def reset(self) -> None:
@@ -135,35 +161,58 @@ class CAMELAgent:
         input_message: HumanMessage,
     ) -> AIMessage:
         messages = self.update_messages(input_message)
-        output_message = self.model(messages)
+        output_message = self.model(self.history_policy.prompt(messages))
         self.update_messages(output_message)
 
         return output_message
 
+    def stream_step(
+        self,
+        input_message: HumanMessage,
+    ) -> Iterator[str]:
+        """
+        Like step, but yields the reply token by token while the model
+        generates it. The full reply is appended to the history once the
+        iterator is exhausted.
+        """
+        messages = self.history_policy.prompt(self.update_messages(input_message))
+        tokens = queue.Queue()
+        done = object()
+        model = self.model.copy(update={
+            "streaming": True,
+            "callback_manager": CallbackManager([_TokenQueueHandler(tokens)]),
+        })
+        result = {}
+
+        def run():
+            try:
+                result["message"] = model(messages)
+            except Exception as e:
+                result["error"] = e
+            tokens.put(done)
+
+        threading.Thread(target=run, daemon=True).start()
+        while (token := tokens.get()) is not done:
+            yield token
+        if "error" in result:
+            self.stored_messages.pop()
+            raise result["error"]
+        self.update_messages(result["message"])
+
     def store_messages(self) -> None:
         return self.stored_messages
 
 
 
 
-def starting_convo(assistant_role_name,user_role_name,task):
-    task_specifier_sys_msg = SystemMessage(content="You can make a task more specific.")
-    task_specifier_prompt = (
-    """Here is a task that {assistant_role_name} will help {user_role_name} to complete: {task}.
+TASK_SPECIFIER_PROMPT = (
+"""Here is a task that {assistant_role_name} will help {user_role_name} to complete: {task}.
     Please make it more specific. Be creative and imaginative.
     Please reply with the specified task in {word_limit} words or less. Do not add anything else."""
-    )
-    task_specifier_template = HumanMessagePromptTemplate.from_template(template=task_specifier_prompt)
-    task_specify_agent = CAMELAgent(task_specifier_sys_msg, ChatOpenAI(temperature=1.0),None)
-    task_specifier_msg = task_specifier_template.format_messages(assistant_role_name=assistant_role_name,
-                                                                user_role_name=user_role_name,
-                                                                task=task, word_limit=word_limit)[0]
-    specified_task_msg = task_specify_agent.step(task_specifier_msg)
-    # print(f"Specified task: {specified_task_msg.content}")
-    specified_task = specified_task_msg.content
+)
 
-    assistant_inception_prompt = (
-    """Never forget you are a {assistant_role_name} and I am a {user_role_name}. Never flip roles! Never instruct me!
+ASSISTANT_INCEPTION_PROMPT = (
+"""Never forget you are a {assistant_role_name} and I am a {user_role_name}. Never flip roles! Never instruct me!
     We share a common interest in collaborating to successfully complete a task.
     You must help me to complete the task.
     Here is the task: {task}. Never forget our task!
@@ -182,10 +231,10 @@ def starting_convo(assistant_role_name,user_role_name,task):
 
     <YOUR_SOLUTION> should be specific and provide preferable implementations and examples for task-solving.
     Always end <YOUR_SOLUTION> with: Next request."""
-    )
+)
 
-    user_inception_prompt = (
-    """Never forget you are a {user_role_name} and I am a {assistant_role_name}. Never flip roles! You will always instruct me.
+USER_INCEPTION_PROMPT = (
+"""Never forget you are a {user_role_name} and I am a {assistant_role_name}. Never flip roles! You will always instruct me.
     We share a common interest in collaborating to successfully complete a task.
     I must help you to complete the task.
     Here is the task: {task}. Never forget our task!
@@ -210,36 +259,75 @@ def starting_convo(assistant_role_name,user_role_name,task):
     Keep giving me instructions and necessary inputs until you think the task is completed.
     When the task is completed, you must only reply with a single word <CAMEL_TASK_DONE>.
     Never say <CAMEL_TASK_DONE> unless my responses have solved your task."""
-    )
-    return specified_task,assistant_inception_prompt,user_inception_prompt
+)
+
+# Compiled once at import; get_sys_msgs falls back to compiling custom prompts.
+TASK_SPECIFIER_TEMPLATE = HumanMessagePromptTemplate.from_template(template=TASK_SPECIFIER_PROMPT)
+_SYS_TEMPLATES = {
+    prompt: SystemMessagePromptTemplate.from_template(template=prompt)
+    for prompt in (ASSISTANT_INCEPTION_PROMPT, USER_INCEPTION_PROMPT)
+}
+
+def starting_convo(assistant_role_name,user_role_name,task,api_key=None,model_name=None):
+    task_specifier_sys_msg = SystemMessage(content="You can make a task more specific.")
+    task_specifier_msg = TASK_SPECIFIER_TEMPLATE.format_messages(assistant_role_name=assistant_role_name,
+                                                                user_role_name=user_role_name,
+                                                                task=task, word_limit=word_limit)[0]
+    if specifier_cache == None:
+        task_specify_agent = CAMELAgent(task_specifier_sys_msg, get_chat_model(api_key, 1.0, model_name),None)
+        specified_task = task_specify_agent.step(task_specifier_msg).content
+    else:
+        # Deterministic mode: the same inputs always specify the same task, so it can be cached.
+        key = cache_key(assistant_role_name, user_role_name, task, model_name or DEFAULT_MODEL, word_limit)
+        specified_task = specifier_cache.get(key)
+        if specified_task == None:
+            task_specify_agent = CAMELAgent(task_specifier_sys_msg, get_chat_model(api_key, 0.0, model_name),None)
+            specified_task = task_specify_agent.step(task_specifier_msg).content
+            specifier_cache.set(key, specified_task)
+    # print(f"Specified task: {specified_task}")
+    return specified_task,ASSISTANT_INCEPTION_PROMPT,USER_INCEPTION_PROMPT
+
+def _sys_template(prompt):
+    return _SYS_TEMPLATES.get(prompt) or SystemMessagePromptTemplate.from_template(template=prompt)
 
 def get_sys_msgs(assistant_role_name: str, user_role_name: str, task: str,assistant_inception_prompt,user_inception_prompt):
     
-    assistant_sys_template = SystemMessagePromptTemplate.from_template(template=assistant_inception_prompt)
-    assistant_sys_msg = assistant_sys_template.format_messages(assistant_role_name=assistant_role_name, user_role_name=user_role_name, task=task)[0]
+    assistant_sys_msg = _sys_template(assistant_inception_prompt).format_messages(assistant_role_name=assistant_role_name, user_role_name=user_role_name, task=task)[0]
     
-    user_sys_template = SystemMessagePromptTemplate.from_template(template=user_inception_prompt)
-    user_sys_msg = user_sys_template.format_messages(assistant_role_name=assistant_role_name, user_role_name=user_role_name, task=task)[0]
+    user_sys_msg = _sys_template(user_inception_prompt).format_messages(assistant_role_name=assistant_role_name, user_role_name=user_role_name, task=task)[0]
     
     return assistant_sys_msg, user_sys_msg
 
-@rp.route("/rp/start", methods=['POST'])
-def start_rp():
-    if not current_user.is_authenticated:
-        return redirect("/agent_convo")
-    os.environ["OPENAI_API_KEY"] = current_user.openai_key
-    assistant_role_name = request.json["role1"]
-    user_role_name = request.json["role2"]
-    task = request.json["task"]
-    sessId = request.json["sessId"]
+def _load_agents(data):
+    """Create or resume the session described by ``data`` and return it, both agents and the next input."""
+    sessId = data["sessId"]
     if sessId == 0:
-        getSession = Agent_Session(role_1=assistant_role_name,role_2=user_role_name,task=task,admin_id=current_user.id)
+        getSession = Agent_Session(role_1=data["role1"],role_2=data["role2"],task=data["task"],admin_id=current_user.id)
         db.session.add(getSession)
         db.session.commit()
-        specified_task,assistant_inception_prompt,user_inception_prompt = starting_convo(assistant_role_name, user_role_name, task)
+    else:
+        getSession = Agent_Session.query.filter_by(id=sessId).first()
+    return (getSession, *_open_agents(getSession, current_user.openai_key, current_user.gpt_model))
+
+def _job_running(data):
+    """True when a background job is advancing the session named in ``data``."""
+    sessId = data.get("sessId", 0)
+    return sessId != 0 and job_queue.find_active(sessId=sessId) is not None
+
+def _open_agents(getSession, api_key=None, model_name=None):
+    """Build both agents for a session, running the opening exchange if it has no history yet."""
+    assistant_role_name = getSession.role_1
+    user_role_name = getSession.role_2
+    task = getSession.task
+    histories = load_histories(getSession)
+    states = history_states(getSession)
+    # Hand the DB connection back to the pool while the model calls run.
+    db.session.commit()
+    if not histories["assistant"]:
+        specified_task,assistant_inception_prompt,user_inception_prompt = starting_convo(assistant_role_name, user_role_name, task, api_key, model_name)
         assistant_sys_msg, user_sys_msg = get_sys_msgs(assistant_role_name, user_role_name, specified_task,assistant_inception_prompt,user_inception_prompt)
-        assistant_agent = CAMELAgent(assistant_sys_msg, ChatOpenAI(temperature=0.2),None)
-        user_agent = CAMELAgent(user_sys_msg, ChatOpenAI(temperature=0.2),None)
+        assistant_agent = CAMELAgent(assistant_sys_msg, get_chat_model(api_key, 0.2, model_name),None)
+        user_agent = CAMELAgent(user_sys_msg, get_chat_model(api_key, 0.2, model_name),None)
         # Reset agents
         assistant_agent.reset()
         user_agent.reset()
@@ -253,45 +341,216 @@ def start_rp():
         user_msg = HumanMessage(content=f"{assistant_sys_msg.content}")
         user_msg = assistant_agent.step(user_msg)
     else:
-        getSession = Agent_Session.query.filter_by(id=sessId).first()
-        user_store = pickle.loads(codecs.decode((getSession.user_store).encode(), "base64"))
-        assistant_store = pickle.loads(codecs.decode((getSession.assistant_store).encode(), "base64"))
-        user_agent = CAMELAgent(None, ChatOpenAI(temperature=0.2),user_store)
-        assistant_agent = CAMELAgent(None, ChatOpenAI(temperature=0.2),assistant_store)
+        user_store = histories["user"]
+        assistant_store = histories["assistant"]
+        user_model = get_chat_model(api_key, 0.2, model_name)
+        assistant_model = get_chat_model(api_key, 0.2, model_name)
+        user_agent = CAMELAgent(None, user_model, user_store, make_history_policy(states.get("user"), user_model))
+        assistant_agent = CAMELAgent(None, assistant_model, assistant_store, make_history_policy(states.get("assistant"), assistant_model))
         assistant_msg = HumanMessage(
             content=(f"{assistant_store[-1].content}"))
+    return user_agent, assistant_agent, assistant_msg
+
+def _clean_user_msg(content):
+    return content.replace("Instruction: ","").replace("Input: None","").replace("Input: None.","")
+
+def _clean_assistant_msg(content):
+    return content.replace("Solution: ","").replace("Next request.","")
 
-    # chat_turn_limit, n = 10, 0
-    # while n < chat_turn_limit:
-        # n += 1
+def _run_turn(getSession, user_agent, assistant_agent, assistant_msg):
+    """Run and save one instruction/solution turn. Returns both cleaned replies, convoEnd and the next input."""
     user_ai_msg = user_agent.step(assistant_msg)
     user_msg = HumanMessage(content=user_ai_msg.content)
-    userMsg = user_msg.content.replace("Instruction: ","").replace("Input: None","").replace("Input: None.","")
+    userMsg = _clean_user_msg(user_msg.content)
     # print(f"AI User ({user_role_name}):\n\n{user_msg.content}\n\n")
     assistant_ai_msg = assistant_agent.step(user_msg)
     assistant_msg = HumanMessage(content=assistant_ai_msg.content)
-    assistantMsg = assistant_msg.content.replace("Solution: ","").replace("Next request.","")
+    assistantMsg = _clean_assistant_msg(assistant_msg.content)
     # print(f"AI Assistant ({assistant_role_name}):\n\n{assistant_msg.content}\n\n")
     convoEnd = False
     if "<CAMEL_TASK_DONE>" in user_msg.content:
         convoEnd = True
-    getUserStore = user_agent.store_messages()
-    getSession.user_store = codecs.encode(pickle.dumps(getUserStore), "base64").decode()
-    getAssistantStore = assistant_agent.store_messages()
-    getSession.assistant_store = codecs.encode(pickle.dumps(getAssistantStore), "base64").decode()
-    db.session.commit()
+    save_turn(getSession, {"user": user_agent, "assistant": assistant_agent})
+    return userMsg, assistantMsg, convoEnd, assistant_msg
+
+@rp.route("/rp/start", methods=['POST'])
+def start_rp():
+    if not current_user.is_authenticated:
+        return redirect("/agent_convo")
+    if _job_running(request.json):
+        return jsonify(error="Session already has a running job"), 409
+    getSession, user_agent, assistant_agent, assistant_msg = _load_agents(request.json)
+
+    userMsg, assistantMsg, convoEnd, assistant_msg = _run_turn(getSession, user_agent, assistant_agent, assistant_msg)
     return jsonify(sessId=getSession.id,userMsg=userMsg,assistantMsg=assistantMsg,convoEnd=convoEnd)
 
 
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@rp.route("/rp/start_stream", methods=['POST'])
+def start_rp_stream():
+    """
+    Streaming variant of /rp/start. Same request body; the reply is a
+    text/event-stream of ``session``, ``user_token``, ``user``,
+    ``assistant_token`` and ``done`` events (``error`` if a model call
+    fails). The turn is saved just before ``done``.
+    """
+    if not current_user.is_authenticated:
+        return redirect("/agent_convo")
+    if _job_running(request.json):
+        return jsonify(error="Session already has a running job"), 409
+    getSession, user_agent, assistant_agent, assistant_msg = _load_agents(request.json)
+
+    def generate():
+        yield _sse("session", {"sessId": getSession.id})
+        try:
+            for token in user_agent.stream_step(assistant_msg):
+                yield _sse("user_token", {"token": token})
+            user_msg = HumanMessage(content=user_agent.stored_messages[-1].content)
+            userMsg = _clean_user_msg(user_msg.content)
+            yield _sse("user", {"msg": userMsg})
+            for token in assistant_agent.stream_step(user_msg):
+                yield _sse("assistant_token", {"token": token})
+        except Exception as e:
+            yield _sse("error", {"error": str(e)})
+            return
+        assistantMsg = _clean_assistant_msg(assistant_agent.stored_messages[-1].content)
+        convoEnd = "<CAMEL_TASK_DONE>" in user_msg.content
+        save_turn(getSession, {"user": user_agent, "assistant": assistant_agent})
+        yield _sse("done", {"sessId": getSession.id, "userMsg": userMsg, "assistantMsg": assistantMsg, "convoEnd": convoEnd})
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+def _session_job(app, sessId, api_key, model_name, max_turns):
+    """Job function running up to ``max_turns`` turns of a session, stopping at <CAMEL_TASK_DONE>."""
+    def run(job):
+        with app.app_context():
+            getSession = db.session.get(Agent_Session, sessId)
+            user_agent, assistant_agent, assistant_msg = _open_agents(getSession, api_key, model_name)
+            for n in range(max_turns):
+                if job.cancelled:
+                    break
+                userMsg, assistantMsg, convoEnd, assistant_msg = _run_turn(getSession, user_agent, assistant_agent, assistant_msg)
+                job.update(turnsCompleted=n + 1, userMsg=userMsg, assistantMsg=assistantMsg, convoEnd=convoEnd)
+                if convoEnd:
+                    break
+    return run
+
+@rp.route("/rp/jobs", methods=['POST'])
+def rp_create_job():
+    """
+    Run a session server-side. Body is the /rp/start body plus an optional
+    ``turns``; without it the job runs until <CAMEL_TASK_DONE>, capped at
+    CAMEL_JOB_MAX_TURNS. Every turn is saved as it completes.
+    """
+    if not current_user.is_authenticated:
+        return redirect("/agent_convo")
+    data = request.json
+    try:
+        max_turns = min(int(data.get("turns") or CAMEL_JOB_MAX_TURNS), CAMEL_JOB_MAX_TURNS)
+    except (TypeError, ValueError):
+        return jsonify(error="turns must be a positive integer"), 400
+    if max_turns < 1:
+        return jsonify(error="turns must be a positive integer"), 400
+    sessId = data.get("sessId", 0)
+    if sessId == 0:
+        getSession = Agent_Session(role_1=data["role1"],role_2=data["role2"],task=data["task"],admin_id=current_user.id)
+        db.session.add(getSession)
+        db.session.commit()
+    else:
+        getSession = Agent_Session.query.filter_by(id=sessId,admin_id=current_user.id).first()
+        if getSession == None:
+            return jsonify(error="Session not found"), 404
+    job = job_queue.submit(
+        _session_job(current_app._get_current_object(), getSession.id, current_user.openai_key, current_user.gpt_model, max_turns),
+        current_user.id, exclusive=("sessId",), sessId=getSession.id, turnsRequested=max_turns, turnsCompleted=0, convoEnd=False)
+    if job == None:
+        return jsonify(error="Session already has a running job"), 409
+    return jsonify(job.to_dict()), 202
+
+@rp.route("/rp/jobs", methods=['GET'])
+def rp_list_jobs():
+    if not current_user.is_authenticated:
+        return redirect("/agent_convo")
+    return jsonify(jobs=[job.to_dict() for job in job_queue.list(owner=current_user.id)])
+
+@rp.route("/rp/jobs/<job_id>", methods=['GET'])
+def rp_get_job(job_id):
+    if not current_user.is_authenticated:
+        return redirect("/agent_convo")
+    job = job_queue.get(job_id)
+    if job == None or job.owner != current_user.id:
+        return jsonify(error="Job not found"), 404
+    return jsonify(job.to_dict())
+
+@rp.route("/rp/jobs/<job_id>/cancel", methods=['POST'])
+def rp_cancel_job(job_id):
+    if not current_user.is_authenticated:
+        return redirect("/agent_convo")
+    job = job_queue.get(job_id)
+    if job == None or job.owner != current_user.id:
+        return jsonify(error="Job not found"), 404
+    return jsonify(cancelled=job_queue.cancel(job_id), **job.to_dict())
+
+
+def _chat_message(row):
+    if row.role == "human":
+        return {"id":row.id,"role":0,"msg":_clean_user_msg(row.content)}
+    return {"id":row.id,"role":1,"msg":_clean_assistant_msg(row.content)}
+
+@rp.route("/rp/search", methods=['GET'])
+def rp_search():
+    """
+    Full-text search over the current user's chats. ``q`` matches every word
+    (``word*`` for a prefix); pages with ``limit`` and ``offset``.
+    """
+    if not current_user.is_authenticated:
+        return redirect("/agent_convo")
+    if search_index is None:
+        return jsonify(error="Search is disabled"), 503
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    offset = max(0, request.args.get('offset', 0, type=int))
+    hits, hasMore = search_index.search(request.args.get('q', ''), source="camel", owner=current_user.id,
+                                        limit=limit, offset=offset)
+    sessions = {s.id: s for s in Agent_Session.query.filter(Agent_Session.id.in_({int(h["ref"]) for h in hits}))}
+    results = []
+    for hit in hits:
+        getSession = sessions.get(int(hit["ref"]))
+        if getSession == None:
+            continue
+        results.append({"sessId":getSession.id,"id":int(hit["doc_id"]),"role":0 if hit["speaker"] == "human" else 1,
+                        "snippet":hit["snippet"],"score":hit["score"],
+                        "role1":getSession.role_1,"role2":getSession.role_2,"task":getSession.task})
+    return jsonify(results=results,offset=offset,hasMore=hasMore)
+
 @rp.route("/rp/get_chat", methods=['get'])
 def rp_get_chat():
+    """
+    Chat of a session. Poll with ``after`` (the id of the last message seen)
+    and ``limit`` to only download new messages; responses carry an ETag and
+    a matching If-None-Match returns 304 without touching the messages.
+    """
     sessId = request.args.get('sessId')
+    after = request.args.get('after', 0, type=int)
+    limit = request.args.get('limit', type=int)
+    if limit is not None:
+        limit = max(1, limit)
     getSession = Agent_Session.query.filter_by(id=sessId).first()
-    assistant_store =  pickle.loads(codecs.decode((getSession.assistant_store).encode(), "base64"))
-    messages = []
-    for store in assistant_store[2:]:
-        if str(type(store)) == "<class 'langchain.schema.HumanMessage'>":
-            messages.append({"role":0,"msg":store.content.replace("Instruction: ","").replace("Input: None","").replace("Input: None.","")})
-        elif str(type(store)) == "<class 'langchain.schema.AIMessage'>":
-            messages.append({"role":1,"msg":store.content.replace("Solution: ","").replace("Next request.","")})
-    return jsonify(role1=getSession.role_1,role2=getSession.role_2,task=getSession.task,messages=messages)
+    if getSession == None:
+        return jsonify(error="Session not found"), 404
+    etag = f"{chat_version(getSession)}-{after}-{limit}"
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
+        response.set_etag(etag)
+        return response
+    rows = chat_rows(getSession, after=after, limit=None if limit is None else limit + 1)
+    hasMore = limit is not None and len(rows) > limit
+    rows = rows[:limit]
+    messages = [_chat_message(row) for row in rows if row.role in ("human", "ai")]
+    response = jsonify(role1=getSession.role_1,role2=getSession.role_2,task=getSession.task,messages=messages,
+                       after=rows[-1].id if rows else after,hasMore=hasMore)
+    response.set_etag(etag)
+    return response
@@ -0,0 +1,96 @@
+"""
+Agent Registry — indexed, read-only views of the fleet for Pauli's Place.
+
+Lookups by id are a dict hit, and the visible / full agent lists and their
+``/api/agents`` JSON bodies are built once per fleet definition instead of
+per request. Each definition is one immutable snapshot, swapped in whole, so
+readers never see a half-loaded fleet.
+
+With a fleet file, the registry re-reads it when its mtime changes (checked
+at most every ``check_interval`` seconds). A file that fails to load leaves
+the current fleet in place; the error is kept in ``last_error``.
+
+Environment:
+    AGENT_FLEET_FILE            — JSON fleet definition: [agent, ...] or {"agents": [...]}
+    AGENT_FLEET_CHECK_INTERVAL  — seconds between mtime checks (default: 2)
+"""
+
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+
+
+class _Snapshot:
+    __slots__ = ("by_id", "all", "visible", "json_all", "json_visible")
+
+    def __init__(self, agents):
+        self.all = tuple(MappingProxyType(dict(a)) for a in agents)
+        self.visible = tuple(a for a in self.all if a["status"] != "hidden")
+        self.by_id = MappingProxyType({a["id"]: a for a in self.all})
+        self.json_all = _dump(agents)
+        self.json_visible = _dump([a for a in agents if a["status"] != "hidden"])
+
+
+def _dump(agents) -> bytes:
+    # Same bytes jsonify() would produce for {"agents": agents}.
+    return (json.dumps({"agents": agents}, sort_keys=True, separators=(",", ":")) + "\n").encode()
+
+
+class AgentRegistry:
+    def __init__(self, agents, path: str = None, check_interval: float = 2.0, clock=time.monotonic):
+        self.path = path
+        self.check_interval = check_interval
+        self.clock = clock
+        self.last_error = None
+        self._mtime = None
+        self._checked_at = clock()
+        self._lock = threading.Lock()
+        self._snapshot = _Snapshot(agents)
+        if path:
+            self._load()
+
+    def get(self, agent_id: str):
+        return self._current().by_id.get(agent_id)
+
+    def agents(self, show_hidden: bool = False) -> tuple:
+        snapshot = self._current()
+        return snapshot.all if show_hidden else snapshot.visible
+
+    def agents_json(self, show_hidden: bool = False) -> bytes:
+        snapshot = self._current()
+        return snapshot.json_all if show_hidden else snapshot.json_visible
+
+    def __len__(self) -> int:
+        return len(self._current().all)
+
+    def _current(self) -> _Snapshot:
+        if self.path and self.clock() - self._checked_at >= self.check_interval:
+            with self._lock:
+                if self.clock() - self._checked_at >= self.check_interval:
+                    self._checked_at = self.clock()
+                    self._load()
+        return self._snapshot
+
+    def _load(self) -> None:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime == self._mtime:
+                return
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            agents = data["agents"] if isinstance(data, dict) else data
+            self._snapshot = _Snapshot(agents)
+            self._mtime = mtime
+            self.last_error = None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+
+
+def registry_from_env(agents) -> AgentRegistry:
+    return AgentRegistry(
+        agents,
+        path=os.environ.get("AGENT_FLEET_FILE") or None,
+        check_interval=float(os.environ.get("AGENT_FLEET_CHECK_INTERVAL", "2")),
+    )
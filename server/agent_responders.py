@@ -0,0 +1,129 @@
+"""
+Agent Responders — who answers for each agent in an agent-discuss round.
+
+A responder takes the agent's registry entry and an agent-fleet-v1 "query"
+envelope (payload.subject = topic, payload.body = recent context) and
+returns the agent's reply text:
+
+    TemplateResponder  — the role-based canned replies (default)
+    StubResponder      — a fixed local acknowledgement, optionally delayed
+    HTTPResponder      — POSTs the envelope to the agent's LLM endpoint
+
+``discuss`` asks every agent concurrently and waits no longer than the
+per-agent timeout (or the round deadline, if shorter). Agents that have not
+answered by then are left out of the reply; the rest keep the requested order.
+
+Environment:
+    AGENT_RESPONDER          — default responder: "template" or "stub" (default: template)
+    AGENT_LLM_ENDPOINTS      — JSON {"agent_id": "https://..."} of HTTP responders
+    AGENT_STUB_DELAY         — seconds the stub responder waits (default: 0)
+    AGENT_RESPONSE_TIMEOUT   — seconds each agent gets to answer (default: 20)
+    AGENT_DISCUSS_DEADLINE   — seconds a whole round may take (default: 30)
+    AGENT_DISCUSS_WORKERS    — agents answered concurrently (default: 16)
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+
+RESPONSE_TIMEOUT = float(os.environ.get("AGENT_RESPONSE_TIMEOUT", "20"))
+DISCUSS_DEADLINE = float(os.environ.get("AGENT_DISCUSS_DEADLINE", "30"))
+
+_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("AGENT_DISCUSS_WORKERS", "16")),
+                               thread_name_prefix="agent-discuss")
+
+
+class TemplateResponder:
+    """Generate a role-appropriate response for MVP."""
+
+    def respond(self, agent, envelope, timeout=None):
+        topic = envelope["payload"]["subject"]
+        role_responses = {
+            "devika": f"I'll coordinate the team on '{topic}'. Let me break this down into tasks and assign to the right agents. Alex, can you handle the architecture? DARYA, I need UI/UX concepts.",
+            "alex": f"On it. I'll create a PRD for '{topic}', then run it through my Architect → Engineer → QA pipeline. Estimating 2 sprint cycles for production-ready output.",
+            "darya": f"I'll design the visual identity for '{topic}'. Luna can handle the social media rollout, and Aurora will track our KPIs. Expect mood boards and wireframes within 24h.",
+            "synthia": f"I can set up voice interactions for '{topic}'. I'll configure the LiveKit pipeline and prepare ElevenLabs voice clone for call workflows.",
+            "clawdbot": f"I'll handle the messaging distribution for '{topic}'. WhatsApp broadcast, Telegram notifications, and SMS alerts. OpenClaw gateway is ready at :18789.",
+            "cynthia": f"I'll monitor the fleet during '{topic}' execution. ACIP compliance check passed. All agent heartbeats nominal. No PII exposure detected in recent messages.",
+            "aurora": f"Dashboard metrics for '{topic}': Agent utilization at 72%, response latency p99 at 340ms, task completion rate 94%. All KPIs green.",
+            "maya": f"I'll prepare the fundraising angle for '{topic}'. Donor outreach sequences ready, A/B testing email campaigns primed.",
+            "luna": f"Viral content strategy for '{topic}' locked in. 3 TikTok hooks scripted, IG carousel template ready, 2 Shorts concepts drafted.",
+        }
+        return role_responses.get(agent["id"], f"Acknowledged re: '{topic}'. Standing by for task assignment from Devika.")
+
+
+class StubResponder:
+    """Local stand-in for an LLM agent, for development and load tests."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    def respond(self, agent, envelope, timeout=None):
+        if self.delay:
+            time.sleep(self.delay)
+        return f"{agent['name']} here. Noted '{envelope['payload']['subject']}'."
+
+
+class HTTPResponder:
+    """
+    POSTs the envelope to ``url``. The reply is either ``{"content": "..."}``
+    or an agent-fleet-v1 envelope whose payload.body is the text.
+    """
+
+    _session = requests.Session()
+
+    def __init__(self, url: str):
+        self.url = url
+
+    def respond(self, agent, envelope, timeout=None):
+        resp = self._session.post(self.url, json=envelope, timeout=timeout or RESPONSE_TIMEOUT)
+        resp.raise_for_status()
+        data = resp.json()
+        return data["content"] if "content" in data else data["payload"]["body"]
+
+
+_default = StubResponder(float(os.environ.get("AGENT_STUB_DELAY", "0"))) \
+    if os.environ.get("AGENT_RESPONDER") == "stub" else TemplateResponder()
+_endpoints = json.loads(os.environ.get("AGENT_LLM_ENDPOINTS") or "{}")
+
+
+def responder_for(agent):
+    """The agent's own ``llm_endpoint`` wins, then AGENT_LLM_ENDPOINTS, then the default responder."""
+    url = agent.get("llm_endpoint") or _endpoints.get(agent["id"])
+    return HTTPResponder(url) if url else _default
+
+
+def discuss(agents, make_envelope, timeout: float = None, deadline: float = None):
+    """
+    Ask each agent concurrently. Returns ``(replies, missed)``: replies is
+    ``[(agent, text)]`` in the order of ``agents``; missed maps the id of each
+    agent that timed out or failed to the reason.
+    """
+    timeout = RESPONSE_TIMEOUT if timeout is None else timeout
+    deadline = DISCUSS_DEADLINE if deadline is None else deadline
+
+    def ask(agent):
+        started = time.monotonic()
+        text = responder_for(agent).respond(agent, make_envelope(agent), timeout=timeout)
+        if time.monotonic() - started > timeout:
+            raise TimeoutError()
+        return text
+
+    futures = [_executor.submit(ask, agent) for agent in agents]
+    wait(futures, timeout=min(timeout, deadline))
+
+    replies, missed = [], {}
+    for agent, future in zip(agents, futures):
+        if not future.done():
+            future.cancel()
+            missed[agent["id"]] = "timeout"
+        elif isinstance(future.exception(), (TimeoutError, requests.Timeout)):
+            missed[agent["id"]] = "timeout"
+        elif future.exception() is not None:
+            missed[agent["id"]] = "error"
+        else:
+            replies.append((agent, future.result()))
+    return replies, missed
@@ -0,0 +1,43 @@
+"""
+Cooperative serving mode for the Flask app.
+
+Under the dev server (or a sync gunicorn worker) every request holds an OS
+thread while it waits on OpenAI or on the Devika proxy, so concurrency is
+capped by the thread count. Here the standard library is monkey-patched by
+gevent before anything else is imported: each request runs in a greenlet
+and every blocking socket call (model completions, SSE streams, proxied
+meeting calls) yields to the other requests, so thousands of waiting
+sessions share one OS thread per process. The blueprints run unchanged.
+
+Run:
+    python async_server.py
+or with gunicorn:
+    gunicorn -k gevent --worker-connections 2000 -w 2 webserver:app
+
+Environment:
+    PORT                   — listen port (default: 5000)
+    ASYNC_MAX_CONNECTIONS  — concurrent requests per process (default: 2000)
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+import os
+
+from gevent.pool import Pool
+from gevent.pywsgi import WSGIServer
+
+from webserver import app
+
+
+def make_server(host="0.0.0.0", port=None, max_connections=None, log="default"):
+    port = int(os.environ.get("PORT", "5000") if port is None else port)
+    max_connections = int(max_connections or os.environ.get("ASYNC_MAX_CONNECTIONS", "2000"))
+    return WSGIServer((host, port), app, spawn=Pool(max_connections), log=log)
+
+
+if __name__ == "__main__":
+    server = make_server()
+    print(f"Serving on :{server.server_port} (gevent, {server.pool.size} connections)")
+    server.serve_forever()
@@ -0,0 +1,131 @@
+"""
+CAMEL Jobs — background worker pool for multi-turn role-play runs.
+
+A job runs many CAMEL turns server-side instead of one turn per HTTP
+request. Jobs are executed by a bounded thread pool; the job function
+checkpoints after every turn and reports progress through ``Job.update``.
+
+Job state lives in process memory. Progress that matters across restarts
+(the turns themselves) is persisted by the job function.
+
+Environment:
+    CAMEL_JOB_WORKERS  — size of the worker pool (default: 4)
+"""
+
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class Job:
+    """State of one background job. ``info`` holds caller-defined progress fields."""
+
+    def __init__(self, owner, **info):
+        self.id = uuid.uuid4().hex[:12]
+        self.owner = owner
+        self.status = "queued"
+        self.error = None
+        self.created_at = _now()
+        self.updated_at = self.created_at
+        self.info = dict(info)
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def update(self, **info) -> None:
+        self.info.update(info)
+        self.updated_at = _now()
+
+    def to_dict(self) -> dict:
+        return {
+            "jobId": self.id,
+            "status": self.status,
+            "error": self.error,
+            "createdAt": self.created_at,
+            "updatedAt": self.updated_at,
+            **self.info,
+        }
+
+
+class JobQueue:
+    """Runs job functions on a thread pool and keeps the most recent jobs for status queries."""
+
+    def __init__(self, max_workers: int = 4, max_finished: int = 500):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="camel-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_finished = max_finished
+
+    def submit(self, fn, owner, exclusive=(), **info):
+        """
+        Queue ``fn(job)``. ``fn`` should return when ``job.cancelled`` becomes true.
+        With ``exclusive`` info keys, returns None instead when an active job
+        already has the same values for them; the check and the queueing are atomic.
+        """
+        job = Job(owner, **info)
+        with self._lock:
+            if exclusive and self._find_active({k: info[k] for k in exclusive}):
+                return None
+            self._jobs[job.id] = job
+            self._trim()
+        self._executor.submit(self._run, fn, job)
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def list(self, owner=None):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job for job in jobs if owner is None or job.owner == owner]
+
+    def find_active(self, **info):
+        """First queued or running job whose info matches all of ``info``."""
+        with self._lock:
+            return self._find_active(info)
+
+    def _find_active(self, info):
+        for job in self._jobs.values():
+            if job.status in ACTIVE_STATUSES and all(job.info.get(k) == v for k, v in info.items()):
+                return job
+        return None
+
+    def cancel(self, job_id) -> bool:
+        job = self.get(job_id)
+        if not job or job.status not in ACTIVE_STATUSES:
+            return False
+        job._cancel.set()
+        return True
+
+    def _run(self, fn, job):
+        if job.cancelled:
+            job.status = "cancelled"
+            return
+        job.status = "running"
+        job.update()
+        try:
+            fn(job)
+            job.status = "cancelled" if job.cancelled else "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        job.update()
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status not in ACTIVE_STATUSES]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+
+job_queue = JobQueue(max_workers=int(os.environ.get("CAMEL_JOB_WORKERS", "4")))
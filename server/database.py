@@ -22,9 +22,24 @@ class Agent_Session(db.Model):
     role_1 = db.Column(db.String(200), default="", server_default = "")
     role_2 = db.Column(db.String(200), default="", server_default = "")
     task = db.Column(db.String(3000), default="", server_default = "")
-    user_store = db.Column(db.String, default="", server_default = "")
-    assistant_store = db.Column(db.String, default="", server_default = "")
+    user_store = db.Column(db.String, default="", server_default = "")  # legacy pickled store, see session_store
+    assistant_store = db.Column(db.String, default="", server_default = "")  # legacy pickled store, see session_store
+    turns = db.Column(db.Integer, default=0, server_default="0")
+    history_state = db.Column(db.Text, default="", server_default = "")  # JSON, see history_policy
     admin_id = db.Column(db.String(100), ForeignKey("admin.id"), index=True)    
+    messages = db.relationship('Agent_Message', backref='session',
+                               cascade="all,delete", lazy='dynamic')
+
+class Agent_Message(db.Model):
+    __tablename__ = "agent_message"
+    __table_args__ = (db.UniqueConstraint("session_id", "speaker", "position"),)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    session_id = db.Column(db.Integer, ForeignKey("agent_session.id"), nullable=False)
+    speaker = db.Column(db.String(20), nullable=False)  # "user" or "assistant" agent
+    position = db.Column(db.Integer, nullable=False)  # index in the speaker's history
+    turn = db.Column(db.Integer, default=0, server_default="0")  # /rp/start call that wrote it
+    role = db.Column(db.String(20), nullable=False)  # "system", "human" or "ai"
+    content = db.Column(db.Text, default="", server_default = "")
 
 class Admin(UserMixin,db.Model):
     __tablename__ = "admin"
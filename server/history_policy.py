@@ -0,0 +1,127 @@
+"""
+History policies decide which part of a CAMELAgent's stored messages is sent
+to the model on each step. The full history is always kept and persisted;
+only the prompt is bounded.
+
+Environment:
+    CAMEL_HISTORY_POLICY      — "rolling" (default) or "full"
+    CAMEL_HISTORY_TURNS       — turns kept verbatim by the rolling policy (default: 6)
+    CAMEL_HISTORY_TOKENS      — prompt token budget of the rolling policy (default: 3000)
+    CAMEL_SUMMARY_TOKENS      — token budget of the rolling summary (default: 400)
+    CAMEL_HISTORY_SUMMARIZER  — "extractive" (default, local) or "llm"
+"""
+
+import os
+import re
+from typing import Callable, List, Optional
+
+from langchain.schema import BaseMessage, HumanMessage, SystemMessage
+
+from tokens import count_message_tokens, truncate_tokens
+
+SUMMARY_PREFIX = "Summary of the conversation so far: "
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s")
+_SPEAKER_LABELS = {"human": "Partner", "ai": "You"}
+
+
+def extractive_summary(summary: str, messages: List[BaseMessage], max_tokens: int) -> str:
+    """Append the first sentence of every message to ``summary``, keeping its most recent part."""
+    lines = [summary] if summary else []
+    for msg in messages:
+        first = _SENTENCE_RE.split(msg.content.strip(), maxsplit=1)[0]
+        lines.append(f"{_SPEAKER_LABELS.get(msg.type, msg.type)}: {truncate_tokens(first, 60)}")
+    return truncate_tokens(" ".join(lines), max_tokens, keep="end")
+
+
+class LLMSummarizer:
+    """Summarizer that asks a chat model to fold new messages into the summary."""
+
+    prompt = ("Update the summary of a conversation with the new messages below. "
+              "Keep decisions, facts and open instructions. Reply with the summary only, "
+              "in at most {max_tokens} tokens.\n\nSummary: {summary}\n\nNew messages:\n{messages}")
+
+    def __init__(self, model) -> None:
+        self.model = model
+
+    def __call__(self, summary: str, messages: List[BaseMessage], max_tokens: int) -> str:
+        lines = "\n".join(f"{_SPEAKER_LABELS.get(m.type, m.type)}: {m.content}" for m in messages)
+        reply = self.model([HumanMessage(content=self.prompt.format(
+            max_tokens=max_tokens, summary=summary or "(empty)", messages=lines))])
+        return truncate_tokens(reply.content, max_tokens)
+
+
+class FullHistory:
+    """Send every stored message."""
+
+    def prompt(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        return messages
+
+    def state(self) -> dict:
+        return {}
+
+
+class RollingSummaryHistory:
+    """
+    Send the system message, a rolling summary of older messages and the last
+    ``keep_turns`` turns verbatim, dropping further turns into the summary
+    until the prompt fits in ``token_budget``. Each message is summarized
+    once; ``state()`` lets the summary survive across requests.
+    """
+
+    def __init__(
+        self,
+        keep_turns: int = 6,
+        token_budget: int = 3000,
+        summary_tokens: int = 400,
+        summarizer: Optional[Callable] = None,
+        state: Optional[dict] = None,
+    ) -> None:
+        self.keep_turns = keep_turns
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer or extractive_summary
+        state = state or {}
+        self.summary = state.get("summary", "")
+        self.summarized = state.get("summarized", 0)  # messages after the system message folded in so far
+
+    def prompt(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        system, rest = messages[0], messages[1:]
+        # The newest message is the pending input, preceded by complete turns.
+        window_start = max(self.summarized, len(rest) - 2 * self.keep_turns - 1)
+        self._fold(rest[self.summarized:window_start])
+        window = rest[window_start:]
+        while len(window) > 1 and count_message_tokens(self._build(system, window)) > self.token_budget:
+            drop = 2 if len(window) > 2 else 1
+            self._fold(window[:drop])
+            window = window[drop:]
+        return self._build(system, window)
+
+    def state(self) -> dict:
+        return {"summary": self.summary, "summarized": self.summarized}
+
+    def _fold(self, messages: List[BaseMessage]) -> None:
+        if messages:
+            self.summary = self.summarizer(self.summary, messages, self.summary_tokens)
+            self.summarized += len(messages)
+
+    def _build(self, system: BaseMessage, window: List[BaseMessage]) -> List[BaseMessage]:
+        if not self.summary:
+            return [system, *window]
+        return [system, SystemMessage(content=SUMMARY_PREFIX + self.summary), *window]
+
+
+def make_history_policy(state: Optional[dict] = None, model=None):
+    """Build the policy configured in the environment, restoring ``state`` if given."""
+    if os.environ.get("CAMEL_HISTORY_POLICY", "rolling") == "full":
+        return FullHistory()
+    summarizer = None
+    if os.environ.get("CAMEL_HISTORY_SUMMARIZER") == "llm" and model is not None:
+        summarizer = LLMSummarizer(model)
+    return RollingSummaryHistory(
+        keep_turns=int(os.environ.get("CAMEL_HISTORY_TURNS", "6")),
+        token_budget=int(os.environ.get("CAMEL_HISTORY_TOKENS", "3000")),
+        summary_tokens=int(os.environ.get("CAMEL_SUMMARY_TOKENS", "400")),
+        summarizer=summarizer,
+        state=state,
+    )
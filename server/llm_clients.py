@@ -0,0 +1,64 @@
+"""
+LLM Clients — ChatOpenAI instances pooled per (API key, model, temperature).
+
+Clients are reused across requests instead of being rebuilt for every call,
+and the API key travels with each completion request instead of through
+``os.environ``, so concurrent users cannot pick up each other's key.
+All clients share one keep-alive HTTP connection pool to the OpenAI API.
+
+Environment:
+    LLM_CLIENT_POOL_SIZE    — max pooled clients (default: 256)
+    LLM_CLIENT_TTL          — seconds a pooled client is kept (default: 900)
+    LLM_HTTP_POOL_MAXSIZE   — keep-alive connections to the OpenAI API (default: 32)
+"""
+
+import hashlib
+import os
+
+import requests
+from langchain.chat_models import ChatOpenAI
+from openai import api_requestor
+
+from ttl_cache import LRUTTLCache
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+
+_clients = LRUTTLCache(
+    maxsize=int(os.environ.get("LLM_CLIENT_POOL_SIZE", "256")),
+    ttl=float(os.environ.get("LLM_CLIENT_TTL", "900")),
+)
+
+
+def _make_http_session() -> requests.Session:
+    pool_size = int(os.environ.get("LLM_HTTP_POOL_MAXSIZE", "32"))
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=2)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_http_session = _make_http_session()
+# The openai package opens one requests.Session per thread. With a thread per
+# request every call paid a fresh TLS handshake; hand all threads the shared
+# pooled session instead.
+api_requestor._make_session = lambda: _http_session
+
+
+def get_chat_model(api_key: str, temperature: float, model_name: str = None) -> ChatOpenAI:
+    """Pooled ChatOpenAI client that sends ``api_key`` with every request."""
+    model_name = model_name or DEFAULT_MODEL
+    key_hash = hashlib.sha256((api_key or "").encode()).hexdigest()
+    return _clients.get_or_set(
+        (key_hash, model_name, temperature),
+        lambda: ChatOpenAI(model_name=model_name, temperature=temperature,
+                           openai_api_key=api_key, model_kwargs={"api_key": api_key}),
+    )
+
+
+def pool_stats() -> dict:
+    return _clients.stats()
+
+
+def clear_pool() -> None:
+    _clients.clear()
@@ -0,0 +1,110 @@
+"""
+Load test for the cooperative serving mode (async_server.py).
+
+Starts a local fake OpenAI chat-completions server that answers after a
+fixed delay, serves the app with async_server on a throwaway SQLite
+database, and opens ``--sessions`` new CAMEL sessions concurrently through
+/rp/start. Each new session makes four model calls, so serving them one
+at a time would take sessions * 4 * latency seconds.
+
+Usage:
+    python loadtest.py --sessions 500 --latency 0.5
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import gevent
+import requests
+from gevent.pool import Pool
+from gevent.pywsgi import WSGIServer
+
+MODEL_CALLS_PER_SESSION = 4
+
+
+def fake_openai_app(latency):
+    """WSGI app answering /v1/chat/completions like OpenAI, after ``latency`` seconds."""
+    def app(environ, start_response):
+        body = json.loads(environ["wsgi.input"].read() or b"{}")
+        gevent.sleep(latency)
+        last = body.get("messages", [{}])[-1].get("content", "")
+        content = "Instruction: next step\nInput: None" if "Solution" in last else "Solution: done. Next request."
+        data = json.dumps({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }).encode()
+        start_response("200 OK", [("Content-Type", "application/json"), ("Content-Length", str(len(data)))])
+        return [data]
+    return app
+
+
+def os_threads():
+    try:
+        return len(os.listdir("/proc/self/task"))
+    except OSError:
+        return None
+
+
+def run(sessions, latency):
+    fake = WSGIServer(("127.0.0.1", 0), fake_openai_app(latency), log=None)
+    fake.start()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/loadtest.db"
+
+    import openai
+    from async_server import make_server
+    from database import db, Admin
+    from webserver import app
+
+    openai.api_base = f"http://127.0.0.1:{fake.server_port}/v1"
+    with app.app_context():
+        db.create_all()
+        db.session.add(Admin(id="loadtest", email="loadtest@example.com", openai_key="sk-loadtest"))
+        db.session.commit()
+
+    server = make_server("127.0.0.1", 0, log=None)
+    server.start()
+    cookie = app.session_interface.get_signing_serializer(app).dumps({"_user_id": "loadtest", "_fresh": True})
+    url = f"http://127.0.0.1:{server.server_port}/rp/start"
+
+    def start_session(i):
+        began = time.perf_counter()
+        resp = requests.post(url, json={"role1": "Coder", "role2": "Trader", "task": f"Task {i}", "sessId": 0},
+                             cookies={app.config["SESSION_COOKIE_NAME"]: cookie}, timeout=300)
+        return resp.status_code, time.perf_counter() - began
+
+    began = time.perf_counter()
+    results = Pool(sessions).map(start_session, range(sessions))
+    elapsed = time.perf_counter() - began
+    server.stop()
+    fake.stop()
+
+    latencies = sorted(seconds for _, seconds in results)
+    return {
+        "sessions": sessions,
+        "ok": sum(1 for code, _ in results if code == 200),
+        "elapsed_s": round(elapsed, 2),
+        "serial_estimate_s": round(sessions * MODEL_CALLS_PER_SESSION * latency, 2),
+        "p50_s": round(statistics.median(latencies), 2),
+        "p95_s": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+        "os_threads": os_threads(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.5, help="fake model latency in seconds")
+    args = parser.parse_args()
+    print(json.dumps(run(args.sessions, args.latency), indent=2))
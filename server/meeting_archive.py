@@ -0,0 +1,156 @@
+"""
+Meeting Archive — compressed NDJSON transcripts of ended meetings.
+
+When a meeting ends its transcript is written as one compressed frame
+(zstd when the ``zstandard`` package is installed, gzip otherwise) appended
+to the current segment file: a header line ``{"meeting": {...}}`` followed by
+one message per line. A SQLite index maps each meeting id to its segment,
+offset and length, so a transcript is read back by seeking straight to its
+frame and decompressing it line by line, never loading it whole.
+
+Appends are serialized through the index's write lock, so every worker on
+the host can archive into the same directory.
+
+Environment:
+    MEETING_ARCHIVE_DIR            — archive directory; archiving is off when unset
+    MEETING_ARCHIVE_SEGMENT_BYTES  — size at which a new segment is started (default: 64 MiB)
+"""
+
+import gzip
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import zstandard  # type: ignore
+except ImportError:
+    zstandard = None
+
+
+class _Slice(io.RawIOBase):
+    """Read-only view of ``length`` bytes of ``f`` starting at ``offset``."""
+
+    def __init__(self, f, offset: int, length: int):
+        f.seek(offset)
+        self._f = f
+        self._left = length
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buf) -> int:
+        n = self._f.readinto(memoryview(buf)[:min(len(buf), self._left)]) if self._left else 0
+        self._left -= n
+        return n
+
+
+def _compress(codec: str, data: bytes) -> bytes:
+    if codec == "zst":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _open_frame(codec: str, raw):
+    if codec == "zst":
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw))
+    return gzip.GzipFile(fileobj=raw)
+
+
+class MeetingArchive:
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.codec = "zst" if zstandard is not None else "gz"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False,
+                                     isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS archives ("
+            "meeting_id TEXT PRIMARY KEY, segment TEXT NOT NULL, offset INTEGER NOT NULL, "
+            "length INTEGER NOT NULL, codec TEXT NOT NULL, message_count INTEGER NOT NULL, "
+            "archived_at REAL NOT NULL)")
+
+    def archive(self, meeting: dict, messages: list) -> None:
+        """Append the meeting's transcript to the current segment and index it; a meeting is archived once."""
+        lines = [json.dumps({"meeting": meeting})] + [json.dumps(m) for m in messages]
+        frame = _compress(self.codec, ("\n".join(lines) + "\n").encode())
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                segment = self._segment_for(len(frame))
+                with open(os.path.join(self.directory, segment), "ab") as f:
+                    offset = f.tell()
+                    f.write(frame)
+                self._conn.execute(
+                    "INSERT INTO archives VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (meeting["id"], segment, offset, len(frame), self.codec, len(messages), time.time()))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def has(self, meeting_id: str) -> bool:
+        return self._entry(meeting_id) is not None
+
+    def message_count(self, meeting_id: str) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT message_count FROM archives WHERE meeting_id = ?",
+                                     (meeting_id,)).fetchone()
+        return row[0] if row else 0
+
+    def get_meeting(self, meeting_id: str):
+        entry = self._entry(meeting_id)
+        if entry is None:
+            return None
+        lines = self._lines(entry)
+        try:
+            return json.loads(next(lines))["meeting"]
+        finally:
+            lines.close()
+
+    def iter_messages(self, meeting_id: str):
+        """Yield the archived messages in order, decompressing as they are read."""
+        entry = self._entry(meeting_id)
+        if entry is None:
+            return
+        lines = self._lines(entry)
+        try:
+            next(lines)  # meeting header
+            for line in lines:
+                yield json.loads(line)
+        finally:
+            lines.close()
+
+    def _lines(self, entry):
+        segment, offset, length, codec = entry
+        with open(os.path.join(self.directory, segment), "rb") as f:
+            with _open_frame(codec, _Slice(f, offset, length)) as frame:
+                yield from frame
+
+    def _entry(self, meeting_id: str):
+        with self._lock:
+            return self._conn.execute("SELECT segment, offset, length, codec FROM archives WHERE meeting_id = ?",
+                                      (meeting_id,)).fetchone()
+
+    def _segment_for(self, size: int) -> str:
+        segments = sorted(n for n in os.listdir(self.directory) if n.startswith("segment-"))
+        if segments:
+            last = segments[-1]
+            path = os.path.join(self.directory, last)
+            if last.endswith(self.codec) and os.path.getsize(path) + size <= self.segment_bytes:
+                return last
+        number = int(segments[-1].split("-")[1].split(".")[0]) + 1 if segments else 1
+        return f"segment-{number:06d}.ndjson.{self.codec}"
+
+
+def make_archive():
+    """The archive in MEETING_ARCHIVE_DIR, or None when archiving is off."""
+    directory = os.environ.get("MEETING_ARCHIVE_DIR")
+    if not directory:
+        return None
+    return MeetingArchive(directory, int(os.environ.get("MEETING_ARCHIVE_SEGMENT_BYTES", str(64 * 1024 * 1024))))
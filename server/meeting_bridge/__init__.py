@@ -9,79 +9,112 @@ This module:
 
 Environment:
     DEVIKA_MEETING_URL  — Devika backend URL (default: http://localhost:1337)
+    DEVIKA_*            — transport limits, see transport.py
+    MEETING_CACHE*      — GET response cache, see cache.py
 """
 
 import os
-import requests
+from urllib.parse import urlencode
+
 from flask import Blueprint, jsonify, request
 
+from .cache import cache_from_env
+from .transport import transport_from_env
+
 DEVIKA_URL = os.environ.get("DEVIKA_MEETING_URL", "http://localhost:1337")
 
 meeting_bridge_bp = Blueprint("meeting_bridge", __name__)
 
+_transport = transport_from_env(DEVIKA_URL)
+
 
 def _devika_api(method: str, path: str, json_data=None):
     """Forward a request to Devika's meeting API."""
-    url = f"{DEVIKA_URL}{path}"
+    if method not in ("GET", "POST", "DELETE"):
+        return {"error": f"Unsupported method {method}"}, 400
     try:
-        if method == "GET":
-            resp = requests.get(url, timeout=10)
-        elif method == "POST":
-            resp = requests.post(url, json=json_data, timeout=10)
-        elif method == "DELETE":
-            resp = requests.delete(url, timeout=10)
-        else:
-            return {"error": f"Unsupported method {method}"}, 400
-        return resp.json(), resp.status_code
-    except requests.ConnectionError:
-        return {"error": "Cannot reach Devika meeting server", "url": url}, 503
+        return _transport.request(method, path, json_data)
     except Exception as e:
         return {"error": str(e)}, 500
 
 
+_cache = cache_from_env(lambda path: _devika_api("GET", path))
+
+# Seconds each polled upstream path stays fresh.
+CACHE_TTLS = {
+    "/api/status": 5,
+    "/api/agents": 60,
+    "/api/integrations/status": 30,
+    "/api/meetings": 2,
+}
+MEETING_DETAIL_TTL = 2
+
+
+def _cached_get(path: str, ttl: float):
+    data, code, state = _cache.get(path, ttl)
+    return data, code, {"X-Cache": state}
+
+
+def _invalidate_meeting(meeting_id=None) -> None:
+    """Drop cached answers a mutation may have changed."""
+    _cache.invalidate("/api/meetings")
+    if meeting_id is not None:
+        _cache.invalidate(f"/api/meetings/{meeting_id}")
+
+
 # ── Proxy endpoints ──────────────────────────────────────────────────────────
 
 @meeting_bridge_bp.route("/meeting/status", methods=["GET"])
 def meeting_status():
     """Check if Devika meeting server is reachable."""
-    data, code = _devika_api("GET", "/api/status")
-    return jsonify({"devika_status": data, "bridge": "online"}), code
+    data, code, headers = _cached_get("/api/status", CACHE_TTLS["/api/status"])
+    return jsonify({"devika_status": data, "bridge": "online", "transport": _transport.stats()}), code, headers
 
 
 @meeting_bridge_bp.route("/meeting/list", methods=["GET"])
 def list_meetings():
-    data, code = _devika_api("GET", "/api/meetings")
-    return jsonify(data), code
+    params = {k: request.args[k] for k in ("status", "meeting_type", "limit", "before") if k in request.args}
+    if params:
+        # Filtered and later pages go upstream; only the default first page is cached.
+        data, code = _devika_api("GET", f"/api/meetings?{urlencode(params)}")
+        return jsonify(data), code
+    data, code, headers = _cached_get("/api/meetings", CACHE_TTLS["/api/meetings"])
+    return jsonify(data), code, headers
 
 
 @meeting_bridge_bp.route("/meeting/create", methods=["POST"])
 def create_meeting():
     payload = request.json or {}
     data, code = _devika_api("POST", "/api/meetings", payload)
+    _invalidate_meeting()
     return jsonify(data), code
 
 
 @meeting_bridge_bp.route("/meeting/<meeting_id>", methods=["GET"])
 def get_meeting(meeting_id):
-    data, code = _devika_api("GET", f"/api/meetings/{meeting_id}")
-    return jsonify(data), code
+    data, code, headers = _cached_get(f"/api/meetings/{meeting_id}", MEETING_DETAIL_TTL)
+    return jsonify(data), code, headers
 
 
 @meeting_bridge_bp.route("/meeting/<meeting_id>/start", methods=["POST"])
 def start_meeting(meeting_id):
     data, code = _devika_api("POST", f"/api/meetings/{meeting_id}/start")
+    _invalidate_meeting(meeting_id)
     return jsonify(data), code
 
 
 @meeting_bridge_bp.route("/meeting/<meeting_id>/end", methods=["POST"])
 def end_meeting(meeting_id):
     data, code = _devika_api("POST", f"/api/meetings/{meeting_id}/end")
+    _invalidate_meeting(meeting_id)
     return jsonify(data), code
 
 
 @meeting_bridge_bp.route("/meeting/<meeting_id>/messages", methods=["GET"])
 def get_messages(meeting_id):
-    data, code = _devika_api("GET", f"/api/meetings/{meeting_id}/messages")
+    params = {k: request.args[k] for k in ("since_id", "since_ts", "limit") if k in request.args}
+    query = f"?{urlencode(params)}" if params else ""
+    data, code = _devika_api("GET", f"/api/meetings/{meeting_id}/messages{query}")
     return jsonify(data), code
 
 
@@ -89,13 +122,14 @@ def get_messages(meeting_id):
 def send_message(meeting_id):
     payload = request.json or {}
     data, code = _devika_api("POST", f"/api/meetings/{meeting_id}/messages", payload)
+    _invalidate_meeting(meeting_id)
     return jsonify(data), code
 
 
 @meeting_bridge_bp.route("/meeting/agents", methods=["GET"])
 def list_agents():
-    data, code = _devika_api("GET", "/api/agents")
-    return jsonify(data), code
+    data, code, headers = _cached_get("/api/agents", CACHE_TTLS["/api/agents"])
+    return jsonify(data), code, headers
 
 
 # ── CAMEL Session → Meeting Adapter ──────────────────────────────────────────
@@ -117,6 +151,7 @@ def create_meeting_from_camel():
         "invite_agents": [],  # agents are seeded by devika
     }
     data, code = _devika_api("POST", "/api/meetings", meeting_data)
+    _invalidate_meeting()
     if code == 200 or code == 201:
         data["camel_session_id"] = payload.get("sessId")
         data["adapted_from"] = "GPT-Agent-im-ready"
@@ -127,5 +162,10 @@ def create_meeting_from_camel():
 
 @meeting_bridge_bp.route("/meeting/integrations", methods=["GET"])
 def integration_status():
-    data, code = _devika_api("GET", "/api/integrations/status")
-    return jsonify(data), code
+    data, code, headers = _cached_get("/api/integrations/status", CACHE_TTLS["/api/integrations/status"])
+    return jsonify(data), code, headers
+
+
+@meeting_bridge_bp.route("/meeting/cache/stats", methods=["GET"])
+def cache_stats():
+    return jsonify(_cache.stats())
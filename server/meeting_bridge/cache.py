@@ -0,0 +1,102 @@
+"""
+Read-through cache for the bridge's polled GET endpoints.
+
+Each upstream path is cached for its own TTL. For a further ``stale``
+seconds an expired answer is still served while one background refresh
+fetches the next one, so dashboards polling the bridge never wait on
+Devika for data that rarely changes. Only 200 responses are cached, and a
+fetch that was started before an invalidation is not cached afterwards.
+
+Environment:
+    MEETING_CACHE        — "on" (default) or "off"
+    MEETING_CACHE_STALE  — seconds an expired answer may still be served (default: 30)
+    MEETING_CACHE_SIZE   — max cached paths (default: 512)
+"""
+
+import os
+import threading
+import time
+
+from ttl_cache import LRUTTLCache
+
+
+class ReadThroughCache:
+    def __init__(self, fetch, stale: float = 30.0, maxsize: int = 512, clock=time.monotonic, enabled: bool = True):
+        self.fetch = fetch  # path -> (data, status_code)
+        self.stale = stale
+        self.clock = clock
+        self.enabled = enabled
+        self.stale_hits = 0
+        self.refreshes = 0
+        self._entries = LRUTTLCache(maxsize=maxsize, clock=clock)  # path -> (fetched_at, ttl, data)
+        self._refreshing = set()
+        self._generation = 0  # bumped by every invalidation
+        self._lock = threading.Lock()
+
+    def get(self, path: str, ttl: float):
+        """Return ``(data, status_code, cache_state)`` where cache_state is HIT, STALE, MISS or BYPASS."""
+        if not self.enabled:
+            data, code = self.fetch(path)
+            return data, code, "BYPASS"
+        entry = self._entries.get(path)
+        if entry is not None:
+            fetched_at, _, data = entry
+            if self.clock() - fetched_at < ttl:
+                return data, 200, "HIT"
+            self.stale_hits += 1
+            self._refresh_in_background(path, ttl)
+            return data, 200, "STALE"
+        data, code = self._load(path, ttl)
+        return data, code, "MISS"
+
+    def invalidate(self, *paths: str) -> None:
+        with self._lock:
+            self._generation += 1
+            for path in paths:
+                self._entries.pop(path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        stats = self._entries.stats()
+        stats.update(enabled=self.enabled, stale_hits=self.stale_hits, refreshes=self.refreshes)
+        return stats
+
+    def _load(self, path: str, ttl: float):
+        generation = self._generation
+        data, code = self.fetch(path)
+        if code == 200:
+            with self._lock:
+                if generation == self._generation:  # else the answer may predate a mutation
+                    self._entries.set(path, (self.clock(), ttl, data), ttl=ttl + self.stale)
+        return data, code
+
+    def _refresh_in_background(self, path: str, ttl: float) -> None:
+        with self._lock:
+            if path in self._refreshing:
+                return
+            self._refreshing.add(path)
+            self.refreshes += 1
+
+        def refresh():
+            try:
+                self._load(path, ttl)
+            except Exception:
+                pass  # keep serving the stale copy until it expires
+            finally:
+                with self._lock:
+                    self._refreshing.discard(path)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+
+def cache_from_env(fetch) -> ReadThroughCache:
+    return ReadThroughCache(
+        fetch,
+        stale=float(os.environ.get("MEETING_CACHE_STALE", "30")),
+        maxsize=int(os.environ.get("MEETING_CACHE_SIZE", "512")),
+        enabled=os.environ.get("MEETING_CACHE", "on") != "off",
+    )
@@ -0,0 +1,149 @@
+"""
+HTTP transport for the meeting bridge's calls to Devika.
+
+One keep-alive connection pool shared by every proxied call, a cap on
+concurrent calls, bounded retries with jittered exponential backoff for
+idempotent methods, and a circuit breaker that fails fast while Devika is
+down instead of letting each request wait for its own timeout.
+
+Environment:
+    DEVIKA_CONNECT_TIMEOUT   — seconds to establish a connection (default: 2)
+    DEVIKA_TIMEOUT           — seconds to wait for a response (default: 10)
+    DEVIKA_RETRIES           — retries for GET/DELETE (default: 2)
+    DEVIKA_MAX_CONNECTIONS   — concurrent calls / pooled connections (default: 20)
+    DEVIKA_BREAKER_FAILURES  — consecutive failures that open the circuit (default: 5)
+    DEVIKA_BREAKER_RESET     — seconds before a trial call is let through (default: 15)
+"""
+
+import os
+import random
+import threading
+import time
+
+import requests
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "DELETE")
+RETRY_STATUSES = (502, 503, 504)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures; lets one trial call through after ``reset_timeout``."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 15.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half-open" and self._trial):
+                raise CircuitOpenError()
+            if state == "half-open":
+                self._trial = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+            self._trial = False
+
+
+class Transport:
+    """Pooled, retrying, circuit-broken JSON client for one upstream base URL."""
+
+    def __init__(
+        self,
+        base_url: str,
+        connect_timeout: float = 2.0,
+        read_timeout: float = 10.0,
+        retries: int = 2,
+        backoff: float = 0.1,
+        max_connections: int = 20,
+        breaker: CircuitBreaker = None,
+    ):
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method: str, path: str, json_data=None):
+        """Call the upstream and return ``(json_body, status_code)``; errors become 5xx bodies."""
+        url = f"{self.base_url}{path}"
+        attempts = 1 + (self.retries if method in IDEMPOTENT_METHODS else 0)
+        for attempt in range(attempts):
+            if attempt:
+                # Full jitter: spread retries of concurrent callers apart.
+                time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+            # Take a slot first: a half-open trial must always end in a recorded outcome.
+            if not self._slots.acquire(timeout=self.timeout[0]):
+                return {"error": "Too many concurrent calls to Devika", "url": url}, 503
+            try:
+                try:
+                    self.breaker.before_call()
+                except CircuitOpenError:
+                    return {"error": "Devika meeting server unavailable (circuit open)", "url": url}, 503
+                try:
+                    resp = self.session.request(method, url, json=json_data, timeout=self.timeout)
+                except requests.RequestException:
+                    self.breaker.record_failure()
+                    continue
+                except Exception:
+                    self.breaker.record_failure()
+                    raise
+            finally:
+                self._slots.release()
+            if resp.status_code in RETRY_STATUSES:
+                self.breaker.record_failure()
+                if attempt + 1 < attempts:
+                    continue
+            else:
+                self.breaker.record_success()
+            return resp.json(), resp.status_code
+        return {"error": "Cannot reach Devika meeting server", "url": url}, 503
+
+    def stats(self) -> dict:
+        return {"circuit": self.breaker.state, "consecutive_failures": self.breaker.failures}
+
+
+def transport_from_env(base_url: str) -> Transport:
+    return Transport(
+        base_url,
+        connect_timeout=float(os.environ.get("DEVIKA_CONNECT_TIMEOUT", "2")),
+        read_timeout=float(os.environ.get("DEVIKA_TIMEOUT", "10")),
+        retries=int(os.environ.get("DEVIKA_RETRIES", "2")),
+        max_connections=int(os.environ.get("DEVIKA_MAX_CONNECTIONS", "20")),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.environ.get("DEVIKA_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.environ.get("DEVIKA_BREAKER_RESET", "15")),
+        ),
+    )
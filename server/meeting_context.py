@@ -0,0 +1,80 @@
+"""
+Meeting Context — bounded discussion context for agent-discuss rounds.
+
+Each meeting keeps the latest messages verbatim and, as they age out, folds
+the first sentence of each into a rolling summary, so the context handed to
+the agents stays within a token budget however long the meeting runs.
+Contexts are cached per meeting and advanced from the store's message
+cursor: every message is folded once, whichever worker appended it, and a
+round only reads the messages added since the previous one.
+
+Environment:
+    MEETING_CONTEXT_TOKENS  — token budget of a meeting's context (default: 800)
+    MEETING_CONTEXT_CACHE   — meetings whose context is kept (default: 1024)
+"""
+
+import os
+import re
+import threading
+from collections import deque
+
+from tokens import count_tokens, truncate_tokens
+from ttl_cache import LRUTTLCache
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s")
+
+
+class MeetingContext:
+    def __init__(self, token_budget: int = 800):
+        self.summary_tokens = token_budget // 3
+        self.recent_tokens = token_budget - self.summary_tokens
+        self.line_tokens = min(200, self.recent_tokens)
+        self.summary = ""
+        self.recent = deque()  # (line, tokens), oldest first
+        self.recent_used = 0
+        self.cursor = None  # id of the last message folded in
+        self.lock = threading.Lock()
+
+    def add(self, message: dict) -> None:
+        line = f"{message['agent_name']}: {truncate_tokens(message['content'].strip(), self.line_tokens)}"
+        tokens = count_tokens(line)
+        self.recent.append((line, tokens))
+        self.recent_used += tokens
+        while self.recent_used > self.recent_tokens and len(self.recent) > 1:
+            old, old_tokens = self.recent.popleft()
+            self.recent_used -= old_tokens
+            first = _SENTENCE_RE.split(old, maxsplit=1)[0]
+            self.summary = truncate_tokens(f"{self.summary} {first}".strip(), self.summary_tokens, keep="end")
+        self.cursor = message["id"]
+
+    def render(self) -> str:
+        recent = " | ".join(line for line, _ in self.recent)
+        return f"Earlier: {self.summary} | Recent: {recent}" if self.summary else recent
+
+
+class MeetingContexts:
+    def __init__(self, token_budget: int = 800, maxsize: int = 1024):
+        self.token_budget = token_budget
+        self._contexts = LRUTTLCache(maxsize=maxsize)
+
+    def context(self, meeting_id: str, store) -> str:
+        """The meeting's context, after folding in messages appended since the last call."""
+        ctx = self._contexts.get_or_set(meeting_id, lambda: MeetingContext(self.token_budget))
+        with ctx.lock:
+            new = store.get_messages(meeting_id, since_id=ctx.cursor)
+            if new is None:  # cursor message was pruned; start over
+                ctx = MeetingContext(self.token_budget)
+                self._contexts.set(meeting_id, ctx)
+                new = store.get_messages(meeting_id)
+            for message in new:
+                ctx.add(message)
+            return ctx.render()
+
+    def forget(self, meeting_id: str) -> None:
+        self._contexts.pop(meeting_id)
+
+
+contexts = MeetingContexts(
+    token_budget=int(os.environ.get("MEETING_CONTEXT_TOKENS", "800")),
+    maxsize=int(os.environ.get("MEETING_CONTEXT_CACHE", "1024")),
+)
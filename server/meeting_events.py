@@ -0,0 +1,78 @@
+"""
+Meeting Events — in-process pub/sub fan-out for Pauli's Place.
+
+Every published event is put once on each subscriber's bounded queue.
+Publishing never blocks: a subscriber whose queue is full has fallen too far
+behind and is cut off. It still receives what is already queued and is then
+told to resync from the messages endpoint (``since_id``).
+
+Subscribers only see events published in their own worker process; with a
+multi-worker SQLite store, clients fall back to cursor polling after a resync.
+
+Environment:
+    MEETING_STREAM_QUEUE  — events buffered per subscriber (default: 256)
+"""
+
+import os
+import queue
+import threading
+
+
+class Subscription:
+    def __init__(self, meeting_id: str, maxsize: int):
+        self.meeting_id = meeting_id
+        self.queue = queue.Queue(maxsize)
+        self.overflowed = False
+
+    def get(self, timeout: float):
+        """Next ``(event, data)``; None on timeout. Raises ``queue.Empty`` once an overflowed queue is drained."""
+        try:
+            return self.queue.get(timeout=0 if self.overflowed else timeout)
+        except queue.Empty:
+            if self.overflowed:
+                raise
+            return None
+
+
+class MeetingBroker:
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._subscribers = {}  # meeting_id -> set of Subscription
+        self._lock = threading.Lock()
+
+    def subscribe(self, meeting_id: str) -> Subscription:
+        sub = Subscription(meeting_id, self.maxsize)
+        with self._lock:
+            self._subscribers.setdefault(meeting_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subscribers.get(sub.meeting_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.meeting_id]
+
+    def publish(self, meeting_id: str, event: str, data) -> int:
+        """Queue ``(event, data)`` for every subscriber of the meeting; returns how many received it."""
+        with self._lock:
+            subs = list(self._subscribers.get(meeting_id, ()))
+        delivered = 0
+        for sub in subs:
+            try:
+                sub.queue.put_nowait((event, data))
+                delivered += 1
+            except queue.Full:
+                sub.overflowed = True
+                self.unsubscribe(sub)
+        return delivered
+
+    def subscriber_count(self, meeting_id: str = None) -> int:
+        with self._lock:
+            if meeting_id is not None:
+                return len(self._subscribers.get(meeting_id, ()))
+            return sum(len(s) for s in self._subscribers.values())
+
+
+broker = MeetingBroker(int(os.environ.get("MEETING_STREAM_QUEUE", "256")))
@@ -0,0 +1,331 @@
+"""
+Meeting Store — storage backends for Pauli's Place meetings and messages.
+
+``MemoryMeetingStore`` keeps everything in the worker process (the old
+behaviour). ``SQLiteMeetingStore`` keeps meetings in a WAL-mode SQLite file,
+so every gunicorn worker on the host sees the same meetings and they survive
+restarts. Messages are indexed by (meeting_id, timestamp) and meetings by
+created_at. Both backends apply the same retention policy to ended meetings.
+
+Messages are returned in append order. ``get_messages`` takes a ``since_id``
+or ``since_ts`` cursor and a ``limit`` so pollers read only new messages.
+Meetings are numbered in creation order; ``list_meetings`` walks that order
+newest first, per status / meeting_type when filtered, and pages by number.
+
+Environment:
+    PAULIS_PLACE_STORE          — "memory" (default) or "sqlite:///path/to/meetings.db"
+    PAULIS_PLACE_KEEP_ENDED     — ended meetings kept, newest first (default: 500)
+    PAULIS_PLACE_ENDED_TTL      — seconds an ended meeting is kept (default: 604800)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta, timezone
+
+
+def _cutoff(max_age: float) -> str:
+    return (datetime.now(timezone.utc) - timedelta(seconds=max_age)).isoformat()
+
+
+def _index_keys(meeting: dict) -> tuple:
+    return None, ("status", meeting["status"]), ("meeting_type", meeting.get("meeting_type"))
+
+
+class MemoryMeetingStore:
+    def __init__(self, keep_ended: int = 500, ended_ttl: float = 604800):
+        self.keep_ended = keep_ended
+        self.ended_ttl = ended_ttl
+        self._meetings = {}  # meeting_id -> meeting dict
+        self._messages = {}  # meeting_id -> [message dicts], in append order
+        self._positions = {}  # meeting_id -> {message_id: index in _messages}
+        self._seq = 0
+        self._seqs = {}  # meeting_id -> creation number
+        self._ids = {}  # creation number -> meeting_id
+        self._index = {}  # None | (field, value) -> ascending creation numbers
+        self._lock = threading.Lock()
+
+    def create_meeting(self, meeting: dict) -> None:
+        with self._lock:
+            self._seq += 1
+            self._meetings[meeting["id"]] = dict(meeting)
+            self._messages[meeting["id"]] = []
+            self._positions[meeting["id"]] = {}
+            self._seqs[meeting["id"]] = self._seq
+            self._ids[self._seq] = meeting["id"]
+            self._reindex(self._seq, (), _index_keys(meeting))
+
+    def get_meeting(self, meeting_id: str):
+        meeting = self._meetings.get(meeting_id)
+        return dict(meeting) if meeting else None
+
+    def update_meeting(self, meeting_id: str, **fields):
+        with self._lock:
+            meeting = self._meetings.get(meeting_id)
+            if meeting is None:
+                return None
+            old_keys = _index_keys(meeting)
+            meeting.update(fields)
+            self._reindex(self._seqs[meeting_id], old_keys, _index_keys(meeting))
+            return dict(meeting)
+
+    def list_meetings(self, status: str = None, meeting_type: str = None, before: int = None,
+                      limit: int = None) -> list:
+        """``(cursor, meeting)`` pairs, newest first, created before the ``before`` cursor."""
+        filters = [k for k in (("status", status), ("meeting_type", meeting_type)) if k[1] is not None]
+        with self._lock:
+            # Walk the shortest matching index and check the other filter per meeting.
+            seqs = min((self._index.get(k, []) for k in filters), key=len) if filters else self._index.get(None, [])
+            i = (len(seqs) if before is None else bisect_left(seqs, before)) - 1
+            page = []
+            while i >= 0 and (limit is None or len(page) < limit):
+                meeting = self._meetings[self._ids[seqs[i]]]
+                if all(meeting.get(field) == value for field, value in filters):
+                    page.append((seqs[i], dict(meeting)))
+                i -= 1
+        return page
+
+    def count_meetings(self) -> int:
+        return len(self._meetings)
+
+    def append_message(self, meeting_id: str, message: dict) -> None:
+        self.append_messages([(meeting_id, message)])
+
+    def append_messages(self, items) -> None:
+        """Append ``(meeting_id, message)`` pairs all at once."""
+        with self._lock:
+            for meeting_id, message in items:
+                msgs = self._messages.setdefault(meeting_id, [])
+                self._positions.setdefault(meeting_id, {})[message["id"]] = len(msgs)
+                msgs.append(message)
+
+    def get_messages(self, meeting_id: str, since_id: str = None, since_ts: str = None, limit: int = None):
+        """Messages after the ``since_id`` message and newer than ``since_ts``; None if ``since_id`` is unknown."""
+        msgs = self._messages.get(meeting_id, [])
+        start = 0
+        if since_id is not None:
+            index = self._positions.get(meeting_id, {}).get(since_id)
+            if index is None:
+                return None
+            start = index + 1
+        if since_ts is not None:
+            start = bisect_right(msgs, since_ts, lo=start, key=lambda m: m["timestamp"])
+        end = len(msgs) if limit is None else start + limit
+        return msgs[start:end]
+
+    def count_messages(self, meeting_id: str) -> int:
+        return len(self._messages.get(meeting_id, []))
+
+    def delete_messages(self, meeting_id: str, through_id: str) -> None:
+        """Delete the meeting's messages up to and including ``through_id``."""
+        with self._lock:
+            index = self._positions.get(meeting_id, {}).get(through_id)
+            if index is None:
+                return
+            rest = self._messages[meeting_id][index + 1:]
+            self._messages[meeting_id] = rest
+            self._positions[meeting_id] = {m["id"]: i for i, m in enumerate(rest)}
+
+    def prune_ended(self) -> list:
+        """Drop ended meetings past the retention limits; returns the ids removed."""
+        cutoff = _cutoff(self.ended_ttl)
+        with self._lock:
+            ended = sorted((m for m in self._meetings.values() if m["status"] == "ended"),
+                           key=lambda m: m["ended_at"] or "", reverse=True)
+            doomed = [m["id"] for i, m in enumerate(ended)
+                      if i >= self.keep_ended or (m["ended_at"] or "") < cutoff]
+            for meeting_id in doomed:
+                seq = self._seqs.pop(meeting_id)
+                self._reindex(seq, _index_keys(self._meetings.pop(meeting_id)), ())
+                del self._ids[seq]
+                self._messages.pop(meeting_id, None)
+                self._positions.pop(meeting_id, None)
+        return doomed
+
+    def _reindex(self, seq: int, old_keys, new_keys) -> None:
+        for key in old_keys:
+            if key not in new_keys:
+                seqs = self._index[key]
+                del seqs[bisect_left(seqs, seq)]
+        for key in new_keys:
+            if key not in old_keys:
+                insort(self._index.setdefault(key, []), seq)
+
+
+class SQLiteMeetingStore:
+    """Meetings and messages shared by all workers on a host; rows hold the JSON documents."""
+
+    def __init__(self, path: str, keep_ended: int = 500, ended_ttl: float = 604800):
+        self.keep_ended = keep_ended
+        self.ended_ttl = ended_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meetings (
+                id TEXT PRIMARY KEY,
+                created_at TEXT NOT NULL,
+                status TEXT NOT NULL,
+                ended_at TEXT,
+                data TEXT NOT NULL,
+                meeting_type TEXT,
+                seq INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS messages (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT NOT NULL UNIQUE,
+                meeting_id TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_messages_meeting_timestamp ON messages (meeting_id, timestamp);
+            CREATE INDEX IF NOT EXISTS ix_messages_meeting_seq ON messages (meeting_id, seq);
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(meetings)")}
+        if "seq" not in columns:
+            # Store files created before meetings were numbered.
+            self._conn.executescript("""
+                ALTER TABLE meetings ADD COLUMN meeting_type TEXT;
+                ALTER TABLE meetings ADD COLUMN seq INTEGER;
+                UPDATE meetings SET seq = rowid, meeting_type = json_extract(data, '$.meeting_type');
+            """)
+        self._conn.executescript("""
+            CREATE INDEX IF NOT EXISTS ix_meetings_created_at ON meetings (created_at);
+            CREATE INDEX IF NOT EXISTS ix_meetings_status_ended_at ON meetings (status, ended_at);
+            CREATE UNIQUE INDEX IF NOT EXISTS ix_meetings_seq ON meetings (seq);
+            CREATE INDEX IF NOT EXISTS ix_meetings_status_seq ON meetings (status, seq);
+            CREATE INDEX IF NOT EXISTS ix_meetings_type_seq ON meetings (meeting_type, seq);
+        """)
+
+    def create_meeting(self, meeting: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO meetings (id, created_at, status, ended_at, data, meeting_type, seq) "
+                "SELECT ?, ?, ?, ?, ?, ?, COALESCE(MAX(seq), 0) + 1 FROM meetings",
+                (meeting["id"], meeting["created_at"], meeting["status"], meeting.get("ended_at"),
+                 json.dumps(meeting), meeting.get("meeting_type")))
+
+    def get_meeting(self, meeting_id: str):
+        rows = self._fetchall("SELECT data FROM meetings WHERE id = ?", (meeting_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def update_meeting(self, meeting_id: str, **fields):
+        with self._lock:
+            # IMMEDIATE takes the write lock up front so the read-modify-write
+            # cannot interleave with another worker's update.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT data FROM meetings WHERE id = ?", (meeting_id,)).fetchone()
+                if row is None:
+                    self._conn.execute("ROLLBACK")
+                    return None
+                meeting = json.loads(row[0])
+                meeting.update(fields)
+                self._conn.execute(
+                    "UPDATE meetings SET status = ?, ended_at = ?, meeting_type = ?, data = ? WHERE id = ?",
+                    (meeting["status"], meeting.get("ended_at"), meeting.get("meeting_type"), json.dumps(meeting),
+                     meeting_id))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return meeting
+
+    def list_meetings(self, status: str = None, meeting_type: str = None, before: int = None,
+                      limit: int = None) -> list:
+        """``(cursor, meeting)`` pairs, newest first, created before the ``before`` cursor."""
+        where, params = [], []
+        if status is not None:
+            where.append("status = ?")
+            params.append(status)
+        if meeting_type is not None:
+            where.append("meeting_type = ?")
+            params.append(meeting_type)
+        if before is not None:
+            where.append("seq < ?")
+            params.append(before)
+        sql = "SELECT seq, data FROM meetings"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY seq DESC LIMIT ?"
+        params.append(-1 if limit is None else limit)
+        return [(r[0], json.loads(r[1])) for r in self._fetchall(sql, params)]
+
+    def count_meetings(self) -> int:
+        return self._fetchall("SELECT COUNT(*) FROM meetings")[0][0]
+
+    def append_message(self, meeting_id: str, message: dict) -> None:
+        self.append_messages([(meeting_id, message)])
+
+    def append_messages(self, items) -> None:
+        """Append ``(meeting_id, message)`` pairs in one transaction."""
+        rows = [(m["id"], meeting_id, m["timestamp"], json.dumps(m)) for meeting_id, m in items]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("INSERT INTO messages (id, meeting_id, timestamp, data) VALUES (?, ?, ?, ?)",
+                                       rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get_messages(self, meeting_id: str, since_id: str = None, since_ts: str = None, limit: int = None):
+        """Messages after the ``since_id`` message and newer than ``since_ts``; None if ``since_id`` is unknown."""
+        sql, params = "SELECT data FROM messages WHERE meeting_id = ?", [meeting_id]
+        if since_id is not None:
+            rows = self._fetchall("SELECT seq FROM messages WHERE id = ? AND meeting_id = ?", (since_id, meeting_id))
+            if not rows:
+                return None
+            sql += " AND seq > ?"
+            params.append(rows[0][0])
+        if since_ts is not None:
+            sql += " AND timestamp > ?"
+            params.append(since_ts)
+        sql += " ORDER BY seq LIMIT ?"
+        params.append(-1 if limit is None else limit)
+        return [json.loads(r[0]) for r in self._fetchall(sql, params)]
+
+    def count_messages(self, meeting_id: str) -> int:
+        return self._fetchall("SELECT COUNT(*) FROM messages WHERE meeting_id = ?", (meeting_id,))[0][0]
+
+    def delete_messages(self, meeting_id: str, through_id: str) -> None:
+        """Delete the meeting's messages up to and including ``through_id``."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM messages WHERE meeting_id = ? AND seq <= "
+                "(SELECT seq FROM messages WHERE id = ? AND meeting_id = ?)", (meeting_id, through_id, meeting_id))
+
+    def prune_ended(self) -> list:
+        """Drop ended meetings past the retention limits; returns the ids removed."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                doomed = [r[0] for r in self._conn.execute(
+                    "SELECT id FROM meetings WHERE status = 'ended' AND (ended_at < ? OR id NOT IN ("
+                    "SELECT id FROM meetings WHERE status = 'ended' ORDER BY ended_at DESC LIMIT ?))",
+                    (_cutoff(self.ended_ttl), self.keep_ended))]
+                self._conn.executemany("DELETE FROM messages WHERE meeting_id = ?", [(i,) for i in doomed])
+                self._conn.executemany("DELETE FROM meetings WHERE id = ?", [(i,) for i in doomed])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return doomed
+
+    def _fetchall(self, sql: str, params=()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+
+def make_store(spec: str = None):
+    """Build the backend named by ``spec`` (default: PAULIS_PLACE_STORE)."""
+    spec = spec if spec is not None else os.environ.get("PAULIS_PLACE_STORE", "memory")
+    keep_ended = int(os.environ.get("PAULIS_PLACE_KEEP_ENDED", "500"))
+    ended_ttl = float(os.environ.get("PAULIS_PLACE_ENDED_TTL", "604800"))
+    if spec.startswith("sqlite:///"):
+        return SQLiteMeetingStore(spec[len("sqlite:///"):], keep_ended, ended_ttl)
+    return MemoryMeetingStore(keep_ended, ended_ttl)
@@ -1,7 +1,8 @@
 """
 Pauli's Place — Self-Contained Agent Meeting Room Server
 ========================================================
-In-memory meeting room for the executiveusa agent fleet.
+Meeting room for the executiveusa agent fleet, kept in memory or in a shared
+SQLite file (see meeting_store.py).
 No external dependencies — runs standalone as part of GPT-Agent-im-ready.
 
 Agents communicate via agent-fleet-v1 JSON envelope protocol.
@@ -10,21 +11,34 @@ See AGENT_COMMS_PROTOCOL.md for the full specification.
 Routes:
   GET  /api/status                         — Server health
   GET  /api/agents                         — List all fleet agents
-  GET  /api/meetings                       — List meetings
+  GET  /api/meetings                       — List meetings (?status=&meeting_type=&limit=&before=)
   POST /api/meetings                       — Create meeting
   GET  /api/meetings/<id>                  — Get meeting detail
   POST /api/meetings/<id>/start            — Start meeting
   POST /api/meetings/<id>/end              — End meeting
-  GET  /api/meetings/<id>/messages         — Get messages
+  GET  /api/meetings/<id>/messages         — Get messages (?since_id=&since_ts=&limit=)
+  GET  /api/meetings/<id>/stream           — Live message/status events (SSE)
   POST /api/meetings/<id>/messages         — Send message
   POST /api/meetings/<id>/agent-discuss    — Trigger agent discussion round
+  POST /api/messages/batch                 — Append a batch of agent-fleet-v1 envelopes
+  GET  /api/search                         — Full-text search over meeting messages
 """
 
 import os
 import uuid
 import json
+import queue
+from itertools import islice
 from datetime import datetime, timezone
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, Response
+
+from agent_registry import registry_from_env
+from agent_responders import discuss
+from meeting_context import contexts
+from meeting_archive import make_archive
+from meeting_events import broker
+from meeting_store import make_store
+from search_index import search_index
 
 paulis_place_bp = Blueprint("paulis_place", __name__)
 
@@ -165,16 +179,112 @@ FLEET_AGENTS = [
     },
 ]
 
-# ── In-Memory Store ──────────────────────────────────────────────────────────
+# Built-in fleet; AGENT_FLEET_FILE replaces it and is hot-reloaded (see agent_registry.py).
+registry = registry_from_env(FLEET_AGENTS)
+
+# ── Store ────────────────────────────────────────────────────────────────────
 
-meetings_store = {}  # meeting_id -> meeting dict
-messages_store = {}  # meeting_id -> [message dicts]
+store = make_store()
+archive = make_archive()  # None unless MEETING_ARCHIVE_DIR is set
+
+MAX_MESSAGES_PAGE = 500
+MAX_BATCH_SIZE = 500
+MEETINGS_PAGE = 50
+MAX_MEETINGS_PAGE = 200
+STREAM_HEARTBEAT = 15  # seconds between keepalive comments on idle streams
 
 
 def _now():
     return datetime.now(timezone.utc).isoformat()
 
 
+def _new_message(agent_id, agent_name, content, message_type="chat", timestamp=None):
+    return {
+        "id": str(uuid.uuid4()),
+        "timestamp": timestamp or _now(),
+        "agent_id": agent_id,
+        "agent_name": agent_name,
+        "content": content,
+        "message_type": message_type,
+    }
+
+
+def _append_message(meeting_id, agent_id, agent_name, content, message_type="chat"):
+    """Store a new meeting message and return it."""
+    message = _new_message(agent_id, agent_name, content, message_type)
+    store.append_message(meeting_id, message)
+    broker.publish(meeting_id, "message", message)
+    _index_messages([(meeting_id, message)])
+    return message
+
+
+def _index_messages(items):
+    """Add ``(meeting_id, message)`` pairs to the search index."""
+    if search_index is not None:
+        search_index.add(("meeting", None, meeting_id, m["id"], m["agent_name"], m["content"]) for meeting_id, m in items)
+
+
+def reindex_meetings():
+    """Rebuild the meeting part of the search index; returns the number of meetings indexed."""
+    if search_index is None:
+        return 0
+    search_index.clear("meeting")
+    meetings = store.list_meetings()
+    for _, meeting in meetings:
+        msgs = _archived_messages(meeting["id"]) if _is_archived(meeting["id"]) else store.get_messages(meeting["id"])
+        _index_messages((meeting["id"], m) for m in msgs)
+    return len(meetings)
+
+
+def _is_archived(meeting_id):
+    if archive is None:
+        return False
+    meeting = store.get_meeting(meeting_id)
+    return (meeting is None or bool(meeting.get("archived_at"))) and archive.has(meeting_id)
+
+
+def _archived_messages(meeting_id, since_id=None, since_ts=None):
+    """Archived transcript, then anything appended after archival, read lazily; None if ``since_id`` is unknown."""
+    def all_messages():
+        last_id = None
+        for msg in archive.iter_messages(meeting_id):
+            last_id = msg["id"]
+            yield msg
+        # Until archival has cleared the live copy, skip what the archive already had.
+        live = store.get_messages(meeting_id, since_id=last_id) if last_id else None
+        yield from (live if live is not None else store.get_messages(meeting_id))
+
+    msgs = all_messages()
+    if since_id is not None:
+        for msg in msgs:
+            if msg["id"] == since_id:
+                break
+        else:
+            return None
+    return (msg for msg in msgs if since_ts is None or msg["timestamp"] > since_ts)
+
+
+def _stream_messages(msgs, since_id):
+    """The messages endpoint's JSON body, written as the transcript is read."""
+    yield '{"messages":['
+    last_id = since_id
+    for i, msg in enumerate(msgs):
+        yield ("," if i else "") + json.dumps(msg)
+        last_id = msg["id"]
+    yield f'],"next_cursor":{json.dumps(last_id)},"has_more":false}}\n'
+
+
+def _agent_name(agent_id):
+    """Resolve agent name from registry."""
+    agent = registry.get(agent_id)
+    return agent["name"] if agent else (agent_id.capitalize() if agent_id != "user" else "User")
+
+
+def _sse(event, data, event_id=None):
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 def _make_envelope(from_agent, to_agent, msg_type, payload, meeting_id=None):
     """Create an agent-fleet-v1 protocol envelope."""
     return {
@@ -199,8 +309,8 @@ def api_status():
         "service": "paulis-place",
         "version": "1.0.0",
         "status": "online",
-        "agents_count": len(FLEET_AGENTS),
-        "meetings_count": len(meetings_store),
+        "agents_count": len(registry),
+        "meetings_count": store.count_meetings(),
         "uptime": _now(),
         "devika_status": {"status": "Lead Delegator online"},
     })
@@ -209,14 +319,17 @@ def api_status():
 @paulis_place_bp.route("/api/agents", methods=["GET"])
 def api_agents():
     show_hidden = request.args.get("show_hidden", "false") == "true"
-    agents = FLEET_AGENTS if show_hidden else [a for a in FLEET_AGENTS if a["status"] != "hidden"]
-    return jsonify({"agents": agents})
+    return Response(registry.agents_json(show_hidden), mimetype="application/json")
 
 
 @paulis_place_bp.route("/api/meetings", methods=["GET"])
 def api_list_meetings():
-    meetings_list = sorted(meetings_store.values(), key=lambda m: m["created_at"], reverse=True)
-    return jsonify({"meetings": meetings_list})
+    """Newest first, MEETINGS_PAGE at a time; ?status=, ?meeting_type=, ?before=<next_cursor>."""
+    limit = max(1, min(request.args.get("limit", MEETINGS_PAGE, type=int), MAX_MEETINGS_PAGE))
+    page = store.list_meetings(status=request.args.get("status"), meeting_type=request.args.get("meeting_type"),
+                               before=request.args.get("before", type=int), limit=limit + 1)
+    next_cursor = page[limit - 1][0] if len(page) > limit else None
+    return jsonify({"meetings": [m for _, m in page[:limit]], "next_cursor": next_cursor})
 
 
 @paulis_place_bp.route("/api/meetings", methods=["POST"])
@@ -235,25 +348,21 @@ def api_create_meeting():
         "attendees": data.get("invite_agents", []),
         "action_items": [],
     }
-    meetings_store[meeting_id] = meeting
-    messages_store[meeting_id] = []
+    store.create_meeting(meeting)
 
     # System message
-    messages_store[meeting_id].append({
-        "id": str(uuid.uuid4()),
-        "timestamp": _now(),
-        "agent_id": "system",
-        "agent_name": "System",
-        "content": f"Meeting \"{meeting['title']}\" created. Agenda: {meeting['agenda'] or 'None set'}",
-        "message_type": "system",
-    })
+    _append_message(meeting_id, "system", "System",
+                    f"Meeting \"{meeting['title']}\" created. Agenda: {meeting['agenda'] or 'None set'}",
+                    "system")
 
     return jsonify({"meeting": meeting}), 201
 
 
 @paulis_place_bp.route("/api/meetings/<meeting_id>", methods=["GET"])
 def api_get_meeting(meeting_id):
-    meeting = meetings_store.get(meeting_id)
+    meeting = store.get_meeting(meeting_id)
+    if not meeting and archive is not None:
+        meeting = archive.get_meeting(meeting_id)
     if not meeting:
         return jsonify({"error": "Meeting not found"}), 404
     return jsonify({"meeting": meeting})
@@ -261,56 +370,140 @@ def api_get_meeting(meeting_id):
 
 @paulis_place_bp.route("/api/meetings/<meeting_id>/start", methods=["POST"])
 def api_start_meeting(meeting_id):
-    meeting = meetings_store.get(meeting_id)
+    meeting = store.update_meeting(meeting_id, status="in_progress", started_at=_now())
     if not meeting:
         return jsonify({"error": "Meeting not found"}), 404
-    meeting["status"] = "in_progress"
-    meeting["started_at"] = _now()
+    broker.publish(meeting_id, "status", meeting)
 
     # Devika opens the meeting
-    messages_store[meeting_id].append({
-        "id": str(uuid.uuid4()),
-        "timestamp": _now(),
-        "agent_id": "devika",
-        "agent_name": "Devika",
-        "content": f"Meeting started. I'm Devika, your Lead Delegator. Let's get to work on: {meeting['agenda'] or meeting['title']}",
-        "message_type": "chat",
-    })
+    _append_message(meeting_id, "devika", "Devika",
+                    f"Meeting started. I'm Devika, your Lead Delegator. Let's get to work on: {meeting['agenda'] or meeting['title']}")
 
     return jsonify({"meeting": meeting})
 
 
 @paulis_place_bp.route("/api/meetings/<meeting_id>/end", methods=["POST"])
 def api_end_meeting(meeting_id):
-    meeting = meetings_store.get(meeting_id)
+    meeting = store.update_meeting(meeting_id, status="ended", ended_at=_now())
     if not meeting:
         return jsonify({"error": "Meeting not found"}), 404
-    meeting["status"] = "ended"
-    meeting["ended_at"] = _now()
+    broker.publish(meeting_id, "status", meeting)
 
     # Summary message
-    msg_count = len(messages_store.get(meeting_id, []))
-    messages_store[meeting_id].append({
-        "id": str(uuid.uuid4()),
-        "timestamp": _now(),
-        "agent_id": "system",
-        "agent_name": "System",
-        "content": f"Meeting ended. {msg_count} messages exchanged. Action items: {len(meeting.get('action_items', []))}",
-        "message_type": "system",
-    })
+    archived = _is_archived(meeting_id)
+    msg_count = store.count_messages(meeting_id) + (archive.message_count(meeting_id) if archived else 0)
+    _append_message(meeting_id, "system", "System",
+                    f"Meeting ended. {msg_count} messages exchanged. Action items: {len(meeting.get('action_items', []))}",
+                    "system")
+    if archive is not None and not archived:
+        # Move the transcript out of the live store; the messages endpoint reads it back.
+        # Ending an archived meeting again leaves the new messages live, read after the archive.
+        meeting["archived_at"] = _now()
+        transcript = store.get_messages(meeting_id)
+        archive.archive(meeting, transcript)
+        store.update_meeting(meeting_id, archived_at=meeting["archived_at"])
+        store.delete_messages(meeting_id, through_id=transcript[-1]["id"])
+    _prune_ended()
 
     return jsonify({"meeting": meeting})
 
 
+def _prune_ended():
+    """Apply retention; pruned meetings leave search unless their transcript is archived."""
+    pruned = store.prune_ended()
+    if search_index is not None:
+        search_index.remove("meeting", [i for i in pruned if archive is None or not archive.has(i)])
+
+
 @paulis_place_bp.route("/api/meetings/<meeting_id>/messages", methods=["GET"])
 def api_get_messages(meeting_id):
-    msgs = messages_store.get(meeting_id, [])
-    return jsonify({"messages": msgs})
+    """
+    Messages in append order. Pollers pass the last id they saw as since_id
+    (or a timestamp as since_ts) and get only newer messages, at most limit.
+    Archived meetings are read back from their compressed transcript.
+    """
+    since_id = request.args.get("since_id")
+    since_ts = request.args.get("since_ts")
+    limit = request.args.get("limit", type=int)
+    if limit is not None:
+        limit = max(1, min(limit, MAX_MESSAGES_PAGE))
+    if _is_archived(meeting_id):
+        msgs = _archived_messages(meeting_id, since_id, since_ts)
+        if msgs is None:
+            return jsonify({"error": "Unknown since_id"}), 400
+        if limit is None:
+            return Response(_stream_messages(msgs, since_id), mimetype="application/json")
+        msgs = list(islice(msgs, limit + 1))
+    else:
+        # One extra row tells us whether another page follows.
+        msgs = store.get_messages(meeting_id, since_id=since_id, since_ts=since_ts,
+                                  limit=None if limit is None else limit + 1)
+    if msgs is None:
+        return jsonify({"error": "Unknown since_id"}), 400
+    has_more = limit is not None and len(msgs) > limit
+    msgs = msgs[:limit]
+    next_cursor = msgs[-1]["id"] if msgs else since_id
+    return jsonify({"messages": msgs, "next_cursor": next_cursor, "has_more": has_more})
+
+
+@paulis_place_bp.route("/api/meetings/<meeting_id>/stream", methods=["GET"])
+def api_stream_meeting(meeting_id):
+    """
+    text/event-stream of ``message`` and ``status`` events for one meeting.
+    Message events carry the message id, so a reconnecting EventSource
+    (Last-Event-ID) or ?since_id= first replays what it missed. A client
+    that falls too far behind gets ``resync`` and should reload from the
+    messages endpoint with the given since_id.
+    """
+    archived = _is_archived(meeting_id)
+    if not archived and not store.get_meeting(meeting_id):
+        return jsonify({"error": "Meeting not found"}), 404
+    since_id = request.args.get("since_id") or request.headers.get("Last-Event-ID")
+    # Subscribe before reading the backlog so nothing appended in between is lost.
+    sub = broker.subscribe(meeting_id)
+    if not since_id:
+        backlog = []
+    elif archived:
+        backlog = _archived_messages(meeting_id, since_id)
+    else:
+        backlog = store.get_messages(meeting_id, since_id=since_id)
+
+    def generate():
+        last_id = since_id
+        replayed = set()
+        try:
+            if backlog is None:
+                yield _sse("resync", {"since_id": None})
+                return
+            for msg in backlog:
+                replayed.add(msg["id"])
+                last_id = msg["id"]
+                yield _sse("message", msg, msg["id"])
+            while True:
+                try:
+                    item = sub.get(timeout=STREAM_HEARTBEAT)
+                except queue.Empty:
+                    yield _sse("resync", {"since_id": last_id})
+                    return
+                if item is None:
+                    yield ": keepalive\n\n"
+                    continue
+                event, data = item
+                if event != "message":
+                    yield _sse(event, data)
+                elif data["id"] not in replayed:
+                    last_id = data["id"]
+                    yield _sse(event, data, data["id"])
+        finally:
+            broker.unsubscribe(sub)
+
+    return Response(generate(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 @paulis_place_bp.route("/api/meetings/<meeting_id>/messages", methods=["POST"])
 def api_send_message(meeting_id):
-    meeting = meetings_store.get(meeting_id)
+    meeting = store.get_meeting(meeting_id)
     if not meeting:
         return jsonify({"error": "Meeting not found"}), 404
 
@@ -319,81 +512,126 @@ def api_send_message(meeting_id):
     content = data.get("content", "")
     msg_type = data.get("message_type", "chat")
 
-    # Resolve agent name from registry
-    agent = next((a for a in FLEET_AGENTS if a["id"] == agent_id), None)
-    agent_name = agent["name"] if agent else (agent_id.capitalize() if agent_id != "user" else "User")
-
-    message = {
-        "id": str(uuid.uuid4()),
-        "timestamp": _now(),
-        "agent_id": agent_id,
-        "agent_name": agent_name,
-        "content": content,
-        "message_type": msg_type,
-    }
-    messages_store.setdefault(meeting_id, []).append(message)
+    message = _append_message(meeting_id, agent_id, _agent_name(agent_id), content, msg_type)
 
     return jsonify({"message": message}), 201
 
 
+def _envelope_to_message(envelope, meetings, timestamp):
+    """``(meeting_id, message)`` for one batch envelope; raises ValueError if it is invalid."""
+    if not isinstance(envelope, dict) or envelope.get("protocol") != "agent-fleet-v1":
+        raise ValueError("not an agent-fleet-v1 envelope")
+    sender, context, payload = envelope.get("from"), envelope.get("context"), envelope.get("payload")
+    if not isinstance(sender, dict):
+        raise ValueError("from must be an object")
+    if not isinstance(context, dict):
+        raise ValueError("context must be an object")
+    if not isinstance(payload, dict):
+        raise ValueError("payload must be an object")
+    agent_id = sender.get("agent_id")
+    if not isinstance(agent_id, str) or not agent_id:
+        raise ValueError("from.agent_id must be a non-empty string")
+    meeting_id = context.get("session_id")
+    if not isinstance(meeting_id, str):
+        raise ValueError("context.session_id must be a string")
+    if meeting_id not in meetings:
+        meetings[meeting_id] = store.get_meeting(meeting_id)
+    if meetings[meeting_id] is None:
+        raise ValueError("context.session_id is not a known meeting")
+    content = payload.get("content", payload.get("body"))
+    if not isinstance(content, str):
+        raise ValueError("payload.content (or payload.body) must be a string")
+    message_type = payload.get("message_type", "chat")
+    if not isinstance(message_type, str):
+        raise ValueError("payload.message_type must be a string")
+    return meeting_id, _new_message(agent_id, _agent_name(agent_id), content, message_type, timestamp)
+
+
+@paulis_place_bp.route("/api/messages/batch", methods=["POST"])
+def api_batch_messages():
+    """
+    Append many messages, for one or many meetings, in one request.
+    Body: [envelope, ...] or {"envelopes": [...]}, each an agent-fleet-v1
+    envelope with context.session_id = meeting id and payload.content.
+    The batch is validated first and appended all-or-nothing; results are
+    per item, in request order.
+    """
+    data = request.json
+    envelopes = data.get("envelopes") if isinstance(data, dict) else data
+    if not isinstance(envelopes, list) or not envelopes:
+        return jsonify({"error": "Expected a non-empty list of envelopes"}), 400
+    if len(envelopes) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"At most {MAX_BATCH_SIZE} envelopes per batch"}), 413
+
+    timestamp = _now()
+    meetings = {}  # each meeting is looked up once per batch
+    items, results = [], []
+    for index, envelope in enumerate(envelopes):
+        try:
+            items.append(_envelope_to_message(envelope, meetings, timestamp))
+            results.append({"index": index, "ok": True})
+        except ValueError as e:
+            results.append({"index": index, "ok": False, "error": str(e)})
+    if len(items) < len(envelopes):
+        return jsonify({"error": "Batch rejected; nothing was appended", "results": results}), 400
+
+    store.append_messages(items)
+    _index_messages(items)
+    for result, (meeting_id, message) in zip(results, items):
+        broker.publish(meeting_id, "message", message)
+        result.update(meeting_id=meeting_id, message_id=message["id"])
+    return jsonify({"results": results, "count": len(items)}), 201
+
+
 @paulis_place_bp.route("/api/meetings/<meeting_id>/agent-discuss", methods=["POST"])
 def api_agent_discuss(meeting_id):
     """
     Trigger a round of agent discussion.
-    For MVP, agents respond with pre-scripted role-appropriate messages.
-    In production, this would call each agent's LLM endpoint.
+    Each agent answers through its responder (see agent_responders.py), all
+    at once; agents that miss the deadline are listed under "missed".
     """
-    meeting = meetings_store.get(meeting_id)
+    meeting = store.get_meeting(meeting_id)
     if not meeting:
         return jsonify({"error": "Meeting not found"}), 404
 
     data = request.json or {}
     topic = data.get("topic", meeting.get("agenda", "general discussion"))
 
-    # Get recent context
-    recent_msgs = messages_store.get(meeting_id, [])[-5:]
-    context_summary = " | ".join([f"{m['agent_name']}: {m['content'][:80]}" for m in recent_msgs])
+    # Rolling summary plus recent messages, within MEETING_CONTEXT_TOKENS
+    context_summary = contexts.context(meeting_id, store)
 
     # Agents that participate (Pauli stays hidden by default)
     participants = ["devika", "alex", "darya", "synthia", "clawdbot", "cynthia"]
     requested_agents = data.get("agents", participants)
 
-    responses = []
+    agents = []
     for agent_id in requested_agents:
-        agent = next((a for a in FLEET_AGENTS if a["id"] == agent_id), None)
+        agent = registry.get(agent_id)
         if not agent or agent.get("status") == "hidden":
             continue
+        agents.append(agent)
+
+    replies, missed = discuss(agents, lambda agent: _make_envelope(
+        "system", agent["id"], "query", {"subject": topic, "body": context_summary}, meeting_id))
+
+    # Appended in request order, whichever agent finished first.
+    responses = [_append_message(meeting_id, agent["id"], agent["name"], content) for agent, content in replies]
+
+    return jsonify({"responses": responses, "count": len(responses), "missed": missed})
 
-        # MVP: Role-based response templates
-        response_content = _generate_agent_response(agent, topic, context_summary)
-        msg = {
-            "id": str(uuid.uuid4()),
-            "timestamp": _now(),
-            "agent_id": agent_id,
-            "agent_name": agent["name"],
-            "content": response_content,
-            "message_type": "chat",
-        }
-        messages_store.setdefault(meeting_id, []).append(msg)
-        responses.append(msg)
-
-    return jsonify({"responses": responses, "count": len(responses)})
-
-
-def _generate_agent_response(agent, topic, context):
-    """Generate a role-appropriate response for MVP. Replace with LLM calls in production."""
-    role_responses = {
-        "devika": f"I'll coordinate the team on '{topic}'. Let me break this down into tasks and assign to the right agents. Alex, can you handle the architecture? DARYA, I need UI/UX concepts.",
-        "alex": f"On it. I'll create a PRD for '{topic}', then run it through my Architect → Engineer → QA pipeline. Estimating 2 sprint cycles for production-ready output.",
-        "darya": f"I'll design the visual identity for '{topic}'. Luna can handle the social media rollout, and Aurora will track our KPIs. Expect mood boards and wireframes within 24h.",
-        "synthia": f"I can set up voice interactions for '{topic}'. I'll configure the LiveKit pipeline and prepare ElevenLabs voice clone for call workflows.",
-        "clawdbot": f"I'll handle the messaging distribution for '{topic}'. WhatsApp broadcast, Telegram notifications, and SMS alerts. OpenClaw gateway is ready at :18789.",
-        "cynthia": f"I'll monitor the fleet during '{topic}' execution. ACIP compliance check passed. All agent heartbeats nominal. No PII exposure detected in recent messages.",
-        "aurora": f"Dashboard metrics for '{topic}': Agent utilization at 72%, response latency p99 at 340ms, task completion rate 94%. All KPIs green.",
-        "maya": f"I'll prepare the fundraising angle for '{topic}'. Donor outreach sequences ready, A/B testing email campaigns primed.",
-        "luna": f"Viral content strategy for '{topic}' locked in. 3 TikTok hooks scripted, IG carousel template ready, 2 Shorts concepts drafted.",
-    }
-    return role_responses.get(agent["id"], f"Acknowledged re: '{topic}'. Standing by for task assignment from Devika.")
+
+@paulis_place_bp.route("/api/search", methods=["GET"])
+def api_search():
+    """Ranked message hits with snippets: ?q=, optional meeting_id, limit and offset."""
+    if search_index is None:
+        return jsonify({"error": "Search is disabled"}), 503
+    limit = max(1, min(request.args.get("limit", 20, type=int), 100))
+    offset = max(0, request.args.get("offset", 0, type=int))
+    hits, has_more = search_index.search(request.args.get("q", ""), source="meeting",
+                                         ref=request.args.get("meeting_id"), limit=limit, offset=offset)
+    results = [{"meeting_id": h["ref"], "message_id": h["doc_id"], "agent_name": h["speaker"],
+                "snippet": h["snippet"], "score": h["score"]} for h in hits]
+    return jsonify({"results": results, "offset": offset, "has_more": has_more})
 
 
 # ── CAMEL Integration ────────────────────────────────────────────────────────
@@ -421,15 +659,10 @@ def api_from_camel():
         "camel_session_id": data.get("sessId"),
         "adapted_from": "GPT-Agent-im-ready",
     }
-    meetings_store[meeting_id] = meeting
-    messages_store[meeting_id] = [{
-        "id": str(uuid.uuid4()),
-        "timestamp": _now(),
-        "agent_id": "system",
-        "agent_name": "System",
-        "content": f"Meeting created from CAMEL session. {role1} (instructor) × {role2} (assistant). Task: {task}",
-        "message_type": "system",
-    }]
+    store.create_meeting(meeting)
+    _append_message(meeting_id, "system", "System",
+                    f"Meeting created from CAMEL session. {role1} (instructor) × {role2} (assistant). Task: {task}",
+                    "system")
 
     return jsonify({"meeting": meeting}), 201
 
@@ -0,0 +1,97 @@
+"""
+Search Index — full-text search over CAMEL chats and meeting transcripts.
+
+A SQLite FTS5 table holds one row per message, added as messages are saved
+(each CAMEL turn, each meeting message), so searching never reads or
+unpickles sessions. Results are ranked by bm25 and come with a highlighted
+snippet. Rows carry their source ("camel" / "meeting"), an owner (the
+session's admin id) and a ref (session or meeting id) for filtering.
+
+Environment:
+    SEARCH_INDEX  — "off" (default), "memory" or "sqlite:///path/to/search.db"
+"""
+
+import os
+import re
+import sqlite3
+import threading
+
+_TERM_RE = re.compile(r"\w+\*?")
+
+
+def match_query(text: str) -> str:
+    """FTS5 query matching every word of ``text``; a trailing * keeps prefix search."""
+    terms = []
+    for term in _TERM_RE.findall(text):
+        prefix = term.endswith("*")
+        terms.append(f'"{term.rstrip("*")}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+class SearchIndex:
+    def __init__(self, path: str = ":memory:"):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_docs USING fts5("
+            "content, speaker, source UNINDEXED, owner UNINDEXED, ref UNINDEXED, doc_id UNINDEXED, "
+            "tokenize = 'porter unicode61')")
+
+    def add(self, docs) -> None:
+        """Index ``(source, owner, ref, doc_id, speaker, content)`` rows in one transaction."""
+        rows = [(content, speaker, source, owner, str(ref), str(doc_id))
+                for source, owner, ref, doc_id, speaker, content in docs]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO search_docs (content, speaker, source, owner, ref, doc_id) VALUES (?, ?, ?, ?, ?, ?)",
+                rows)
+            self._conn.execute("COMMIT")
+
+    def clear(self, source: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM search_docs WHERE source = ?", (source,))
+
+    def remove(self, source: str, refs) -> None:
+        """Drop the rows of the given refs (sessions or meetings)."""
+        with self._lock:
+            self._conn.executemany("DELETE FROM search_docs WHERE source = ? AND ref = ?",
+                                   [(source, str(ref)) for ref in refs])
+
+    def search(self, text: str, source: str = None, owner=None, ref=None, limit: int = 20, offset: int = 0):
+        """``(hits, has_more)``; hits are dicts, best match first."""
+        query = match_query(text)
+        if not query:
+            return [], False
+        sql = ("SELECT source, owner, ref, doc_id, speaker, "
+               "snippet(search_docs, 0, '[', ']', '…', 16), bm25(search_docs) "
+               "FROM search_docs WHERE search_docs MATCH ?")
+        params = [query]
+        for column, value in (("source", source), ("owner", owner), ("ref", ref)):
+            if value is not None:
+                sql += f" AND {column} = ?"
+                params.append(str(value) if column == "ref" else value)
+        sql += " ORDER BY rank LIMIT ? OFFSET ?"
+        params += [limit + 1, offset]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        hits = [{"source": r[0], "owner": r[1], "ref": r[2], "doc_id": r[3], "speaker": r[4],
+                 "snippet": r[5], "score": -r[6]} for r in rows[:limit]]
+        return hits, len(rows) > limit
+
+
+def make_index(spec: str = None):
+    """Build the index named by ``spec`` (default: SEARCH_INDEX); None when search is off."""
+    spec = spec if spec is not None else os.environ.get("SEARCH_INDEX", "off")
+    if spec == "memory":
+        return SearchIndex()
+    if spec.startswith("sqlite:///"):
+        return SearchIndex(spec[len("sqlite:///"):])
+    return None
+
+
+search_index = make_index()
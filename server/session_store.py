@@ -0,0 +1,187 @@
+"""
+Session Store — normalized message persistence for CAMEL role-play sessions.
+
+Each message of the AI user and the AI assistant histories is one row in
+``agent_message`` keyed by (session_id, speaker, position). A turn only
+inserts the messages it produced instead of rewriting the whole history, and
+resuming a session is a single indexed query.
+
+Sessions written by older versions keep their history as base64-pickled
+blobs in ``Agent_Session.user_store`` / ``assistant_store``. They are
+converted on first access, or all at once with ``flask migrate-sessions``.
+
+Saved chat messages are also added to the search index (search_index.py);
+``flask reindex-search`` rebuilds it.
+"""
+
+import codecs
+import json
+import pickle
+from typing import Dict, List
+
+from langchain.schema import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from database import db, Agent_Message, Agent_Session
+from search_index import search_index
+
+SPEAKERS = ("user", "assistant")
+
+# In the assistant's history, position 0 is its system message and position 1
+# the opening human message (the user agent's system prompt); the chat shown
+# to users starts at position 2, the assistant's first reply.
+CHAT_START = 2
+
+_MESSAGE_CLASSES = {
+    "system": SystemMessage,
+    "human": HumanMessage,
+    "ai": AIMessage,
+}
+
+
+def message_from_row(row: Agent_Message) -> BaseMessage:
+    return _MESSAGE_CLASSES[row.role](content=row.content)
+
+
+def load_histories(session: Agent_Session, speakers=SPEAKERS) -> Dict[str, List[BaseMessage]]:
+    """Load the histories of ``speakers`` in a session, oldest first."""
+    convert_pickled_session(session)
+    histories = {speaker: [] for speaker in speakers}
+    rows = (Agent_Message.query
+            .filter(Agent_Message.session_id == session.id,
+                    Agent_Message.speaker.in_(speakers))
+            .order_by(Agent_Message.speaker, Agent_Message.position))
+    for row in rows:
+        histories[row.speaker].append(message_from_row(row))
+    return histories
+
+
+def history_states(session: Agent_Session) -> dict:
+    """Saved history-policy state of each agent, keyed by speaker."""
+    return json.loads(session.history_state) if session.history_state else {}
+
+
+def chat_rows(session: Agent_Session, after: int = 0, limit: int = None) -> List[Agent_Message]:
+    """Visible chat rows of a session with an id greater than ``after``, oldest first."""
+    convert_pickled_session(session)
+    query = (Agent_Message.query
+             .filter(Agent_Message.session_id == session.id,
+                     Agent_Message.speaker == "assistant",
+                     Agent_Message.position >= CHAT_START,
+                     Agent_Message.id > after)
+             .order_by(Agent_Message.id))
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+def chat_version(session: Agent_Session) -> str:
+    """Changes whenever a turn is saved, without touching agent_message."""
+    convert_pickled_session(session)
+    return f"{session.id}-{session.turns or 0}"
+
+
+def append_messages(session_id: int, speaker: str, messages: List[BaseMessage], start: int,
+                    turn: int) -> List[Agent_Message]:
+    """Stage rows for ``messages``; ``start`` is the position of the first one."""
+    rows = [
+        Agent_Message(session_id=session_id, speaker=speaker, position=start + i,
+                      turn=turn, role=msg.type, content=msg.content)
+        for i, msg in enumerate(messages)
+    ]
+    db.session.add_all(rows)
+    return rows
+
+
+def save_turn(session: Agent_Session, agents: Dict[str, object]) -> None:
+    """
+    Persist the messages each agent added since it was loaded, along with its
+    history-policy state, and close the turn. ``agents`` maps a speaker
+    ("user" / "assistant") to its CAMELAgent.
+    """
+    turn = session.turns or 0
+    rows = []
+    for speaker, agent in agents.items():
+        new_messages = agent.stored_messages[agent.saved_count:]
+        rows += append_messages(session.id, speaker, new_messages, agent.saved_count, turn)
+        agent.saved_count = len(agent.stored_messages)
+    session.history_state = json.dumps({speaker: agent.history_policy.state() for speaker, agent in agents.items()})
+    session.turns = turn + 1
+    db.session.commit()
+    index_chat_rows(session, rows)
+
+
+# ── Search ───────────────────────────────────────────────────────────────────
+
+def index_chat_rows(session: Agent_Session, rows: List[Agent_Message]) -> None:
+    """Add the chat messages among ``rows`` (see ``chat_rows``) to the search index."""
+    if search_index is None:
+        return
+    search_index.add(
+        ("camel", session.admin_id, session.id, row.id, row.role, row.content)
+        for row in rows
+        if row.speaker == "assistant" and row.position >= CHAT_START and row.role in ("human", "ai"))
+
+
+def reindex_sessions(batch_size: int = 100) -> int:
+    """Rebuild the CAMEL part of the search index. Returns the number of sessions indexed."""
+    if search_index is None:
+        return 0
+    search_index.clear("camel")
+    indexed, last_id = 0, 0
+    while True:
+        batch = Agent_Session.query.filter(Agent_Session.id > last_id).order_by(Agent_Session.id).limit(batch_size).all()
+        if not batch:
+            return indexed
+        for session in batch:
+            index_chat_rows(session, chat_rows(session))  # converts legacy pickled sessions first
+        indexed += len(batch)
+        last_id = batch[-1].id
+
+
+# ── Legacy pickle migration ─────────────────────────────────────────────────
+
+def _unpickle_store(blob: str) -> List[BaseMessage]:
+    if not blob:
+        return []
+    return pickle.loads(codecs.decode(blob.encode(), "base64"))
+
+
+def _legacy_turn(speaker: str, position: int) -> int:
+    # The first /rp/start call writes 3 user and 5 assistant messages, every
+    # later call appends one instruction/solution pair to both histories.
+    opening = 3 if speaker == "user" else 5
+    return max(0, (position - opening) // 2 + 1)
+
+
+def convert_pickled_session(session: Agent_Session, commit: bool = True) -> bool:
+    """Move a session's pickled stores into agent_message rows. Returns True if converted."""
+    if not session.user_store and not session.assistant_store:
+        return False
+    stores = {
+        "user": _unpickle_store(session.user_store),
+        "assistant": _unpickle_store(session.assistant_store),
+    }
+    for speaker, store in stores.items():
+        for position, msg in enumerate(store):
+            append_messages(session.id, speaker, [msg], position, _legacy_turn(speaker, position))
+    session.turns = _legacy_turn("assistant", len(stores["assistant"]) - 1) + 1 if stores["assistant"] else 0
+    session.user_store = ""
+    session.assistant_store = ""
+    if commit:
+        db.session.commit()
+    return True
+
+
+def migrate_pickled_sessions(batch_size: int = 100) -> int:
+    """Convert every legacy pickled session. Returns the number of sessions converted."""
+    converted = 0
+    while True:
+        batch = (Agent_Session.query
+                 .filter((Agent_Session.user_store != "") | (Agent_Session.assistant_store != ""))
+                 .limit(batch_size).all())
+        if not batch:
+            return converted
+        for session in batch:
+            convert_pickled_session(session, commit=False)
+        db.session.commit()
+        converted += len(batch)
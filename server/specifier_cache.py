@@ -0,0 +1,89 @@
+"""
+Specifier Cache — content-addressed cache for the CAMEL task-specifier step.
+
+When enabled, ``starting_convo`` runs the task specifier deterministically
+(temperature 0) and caches its answer under a hash of
+(role1, role2, task, model, word_limit), so sessions started from the same
+template skip that model round trip.
+
+Environment:
+    TASK_SPECIFIER_CACHE       — "off" (default), "memory" or "sqlite:///path/to/cache.db"
+    TASK_SPECIFIER_CACHE_SIZE  — max cached specifications (default: 1024)
+    TASK_SPECIFIER_CACHE_TTL   — seconds a specification is kept (default: 86400)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from ttl_cache import LRUTTLCache
+
+
+def cache_key(role1: str, role2: str, task: str, model: str, word_limit: int) -> str:
+    raw = json.dumps([role1, role2, task, model, word_limit], ensure_ascii=False)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class MemoryBackend:
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = LRUTTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value) -> None:
+        self._cache.set(key, value)
+
+
+class SQLiteBackend:
+    """Cache shared by all workers on a host; LRU order is tracked in ``used_at``."""
+
+    def __init__(self, path: str, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS specifier_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, used_at REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_specifier_cache_used_at ON specifier_cache (used_at)")
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM specifier_cache WHERE key = ? AND expires_at > ?", (key, now)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE specifier_cache SET used_at = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def set(self, key, value) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO specifier_cache (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl, now))
+            self._conn.execute("DELETE FROM specifier_cache WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "DELETE FROM specifier_cache WHERE key IN ("
+                "SELECT key FROM specifier_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)", (self.maxsize,))
+
+
+def make_cache(spec: str = None):
+    """Build the backend named by ``spec`` (default: TASK_SPECIFIER_CACHE); None when caching is off."""
+    spec = spec if spec is not None else os.environ.get("TASK_SPECIFIER_CACHE", "off")
+    maxsize = int(os.environ.get("TASK_SPECIFIER_CACHE_SIZE", "1024"))
+    ttl = float(os.environ.get("TASK_SPECIFIER_CACHE_TTL", "86400"))
+    if spec == "memory":
+        return MemoryBackend(maxsize, ttl)
+    if spec.startswith("sqlite:///"):
+        return SQLiteBackend(spec[len("sqlite:///"):], maxsize, ttl)
+    return None
+
+
+specifier_cache = make_cache()
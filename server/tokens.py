@@ -0,0 +1,65 @@
+"""
+Local token counting for prompt budgeting.
+
+Uses tiktoken when it is installed and its encoding can be loaded; otherwise
+falls back to a regex estimate that slightly over-counts compared to the
+OpenAI tokenizers, which is the safe side for a budget.
+"""
+
+import re
+from typing import List
+
+try:
+    import tiktoken  # type: ignore
+except ImportError:
+    tiktoken = None
+
+ENCODING_NAME = "cl100k_base"
+MESSAGE_OVERHEAD = 4  # role and separators around every chat message
+REPLY_OVERHEAD = 2  # priming for the model's reply
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        if tiktoken is not None:
+            try:
+                _encoding = tiktoken.get_encoding(ENCODING_NAME)
+            except Exception:
+                _encoding = None
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return sum((len(piece) + 3) // 4 for piece in _PIECE_RE.findall(text))
+
+
+def count_message_tokens(messages: List) -> int:
+    """Tokens a list of chat messages costs as a prompt."""
+    return sum(count_tokens(m.content) + MESSAGE_OVERHEAD for m in messages) + REPLY_OVERHEAD
+
+
+def truncate_tokens(text: str, max_tokens: int, keep: str = "start") -> str:
+    """Cut ``text`` to at most ``max_tokens``, keeping its start or its end."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    words = text.split()
+    lo, hi = 0, len(words)
+    # Binary search for the longest run of words that fits.
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        part = words[:mid] if keep == "start" else words[len(words) - mid:]
+        if count_tokens(" ".join(part)) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    part = words[:lo] if keep == "start" else words[len(words) - lo:]
+    return " ".join(part)
@@ -0,0 +1,73 @@
+"""
+Thread-safe LRU cache with per-entry expiry, shared by the server's
+in-process caches (model clients, task specifications, proxy responses).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUTTLCache:
+    """
+    Holds at most ``maxsize`` entries; each expires ``ttl`` seconds after it
+    was set (``ttl=None`` never expires). Reads refresh LRU order but not
+    expiry. ``hits`` / ``misses`` / ``evictions`` count lookups for stats.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and (entry[0] is None or entry[0] > self.clock()):
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not _MISSING:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl: float = _MISSING) -> None:
+        ttl = self.ttl if ttl is _MISSING else ttl
+        with self._lock:
+            self._data[key] = (None if ttl is None else self.clock() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_set(self, key, factory):
+        """Return the cached value for ``key``, creating it with ``factory()`` on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self), "maxsize": self.maxsize, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+    def __len__(self) -> int:
+        return len(self._data)
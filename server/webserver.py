@@ -13,8 +13,9 @@ import json
 import random
 import requests
 from agent_convo import rp
+from session_store import migrate_pickled_sessions, reindex_sessions
 from meeting_bridge import meeting_bridge_bp
-from paulis_place import paulis_place_bp
+from paulis_place import paulis_place_bp, reindex_meetings
 
 try:
     import config
@@ -28,7 +29,7 @@ app.register_blueprint(meeting_bridge_bp)
 app.register_blueprint(paulis_place_bp)
 app.secret_key = 'autogptsamurai@123'
 
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///./test.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///./test.db')
 db.init_app(app)
 db.app = app
 migrate = Migrate(app, db, compare_type=True,
@@ -43,6 +44,17 @@ def load_user(user_id):
 
 os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
 
+@app.cli.command("migrate-sessions")
+def migrate_sessions():
+    """Convert legacy pickled CAMEL sessions into agent_message rows."""
+    converted = migrate_pickled_sessions()
+    print(f"Converted {converted} pickled sessions")
+
+@app.cli.command("reindex-search")
+def reindex_search():
+    """Rebuild the full-text search index from the CAMEL sessions and meetings."""
+    print(f"Indexed {reindex_sessions()} sessions and {reindex_meetings()} meetings")
+
 @app.route("/change_model", methods=['POST'])
 def change_model():
     model = request.values["model"]
@@ -0,0 +1,49 @@
+"""
+JSON-lines request loop shared by the long-lived service workers.
+
+Each stdin line is a JSON request carrying an ``id``; ``handle(request,
+reply)`` runs on a bounded thread pool and may call ``reply`` more than once
+(streamed chunks). Every reply is echoed the request's id, and a handler that
+raises is answered with ``{"id", "error"}``.
+"""
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def serve_lines(handle, infile, outfile, workers: int = 2):
+    write_lock = threading.Lock()
+
+    def write(message):
+        with write_lock:
+            outfile.write(json.dumps(message) + '\n')
+            outfile.flush()
+
+    def run(request):
+        def reply(message):
+            write({'id': request.get('id'), **message})
+        try:
+            handle(request, reply)
+        except Exception as e:
+            reply({'error': f'{type(e).__name__}: {e}'})
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for line in infile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                write({'id': None, 'error': f'bad request: {e}'})
+                continue
+            pool.submit(run, request)
+
+
+def reply_stream():
+    """Take stdout for replies; anything else printed (engines, subprocesses) goes to stderr."""
+    replies = os.fdopen(os.dup(1), 'w')
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    return replies
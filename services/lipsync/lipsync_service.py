@@ -4,9 +4,19 @@ import json
 import os
 import shutil
 import subprocess
+import sys
 import wave
 from pathlib import Path
 
+try:
+    import numpy as np  # type: ignore
+except ImportError:
+    np = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from json_lines import reply_stream, serve_lines  # noqa: E402
+from media_cache import lipsync_cache  # noqa: E402
+
 MOUTH_MAP = {
     'A': 'mouthOpen',
     'E': 'mouthWide',
@@ -24,7 +34,68 @@ def rhubarb_generate(audio_file: str, output_file: str):
     return True
 
 
-def fallback_generate(text: str, audio_file: str, output_file: str):
+FRAME_SECONDS = 0.02
+MIN_RUN_FRAMES = 3  # shorter runs are folded into the one before (60 ms)
+SILENCE_RATIO = 0.12  # frame RMS below this share of the loud frames' level
+BANDS = ((80, 500), (500, 2000), (2000, 5000))  # Hz: low / mid / high
+
+
+def read_pcm(audio_file: str):
+    """Mono samples in [-1, 1] and the sample rate."""
+    with wave.open(audio_file, 'rb') as wav_file:
+        width, channels, rate = wav_file.getsampwidth(), wav_file.getnchannels(), wav_file.getframerate()
+        raw = wav_file.readframes(wav_file.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width in (2, 4):
+        dtype = '<i2' if width == 2 else '<i4'
+        samples = np.frombuffer(raw, dtype=dtype).astype(np.float32) / float(2 ** (8 * width - 1))
+    else:  # 24-bit: widen each sample to 32 bits
+        padded = np.zeros((len(raw) // 3, 4), dtype=np.uint8)
+        padded[:, 1:] = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        samples = padded.view('<i4').ravel().astype(np.float32) / float(2 ** 31)
+    return samples.reshape(-1, channels).mean(axis=1), rate
+
+
+def audio_timeline(audio_file: str) -> list:
+    """
+    Mouth shapes from the audio: frame-wise RMS energy opens or closes the
+    mouth, and the low / mid / high band energy picks round, open or wide.
+    Runs of the same shape are merged into one keyframe.
+    """
+    samples, rate = read_pcm(audio_file)
+    frame = max(1, int(rate * FRAME_SECONDS))
+    count = -(-len(samples) // frame)
+    if count == 0:
+        return [{'time': 0.0, 'mouth': 'mouthClosed'}]
+    frames = np.zeros(count * frame, dtype=np.float32)
+    frames[:len(samples)] = samples
+    frames = frames.reshape(count, frame)
+
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    power = np.abs(np.fft.rfft(frames * np.hanning(frame), axis=1)) ** 2
+    freqs = np.fft.rfftfreq(frame, 1.0 / rate)
+    bands = np.stack([power[:, (freqs >= lo) & (freqs < hi)].sum(axis=1) for lo, hi in BANDS], axis=1)
+    share = bands / np.maximum(bands.sum(axis=1, keepdims=True), 1e-12)
+
+    shapes = np.array(['mouthClosed', 'mouthRound', 'mouthOpen', 'mouthWide'])
+    code = np.where(share[:, 2] > 0.35, 3, np.where(share[:, 0] > 0.6, 1, 2))
+    loud = np.percentile(rms, 90) if rms.any() else 0.0
+    code[rms <= max(loud * SILENCE_RATIO, 1e-4)] = 0
+
+    starts = np.flatnonzero(np.diff(code, prepend=-1))
+    ends = np.append(starts[1:], count)
+    timeline = []
+    for start, end in zip(starts, ends):
+        mouth = shapes[code[start]]
+        if timeline and (end - start < MIN_RUN_FRAMES or timeline[-1]['mouth'] == mouth):
+            continue  # too short to see, or same shape as the previous kept run
+        timeline.append({'time': round(start * frame / rate, 3), 'mouth': str(mouth)})
+    return timeline
+
+
+def letter_timeline(text: str, audio_file: str) -> list:
+    """Vowels spread evenly over the audio's duration; used without NumPy."""
     with wave.open(audio_file, 'rb') as wav_file:
         duration = wav_file.getnframes() / float(wav_file.getframerate())
     chars = [c for c in text.upper() if c.isalpha()]
@@ -37,22 +108,55 @@ def fallback_generate(text: str, audio_file: str, output_file: str):
         mouth = MOUTH_MAP.get(ch, 'mouthOpen')
         timeline.append({'time': round(t, 3), 'mouth': mouth})
         t += step
-    Path(output_file).write_text(json.dumps(timeline, indent=2))
+    return timeline
 
 
-if __name__ == '__main__':
-    parser = argparse.ArgumentParser()
-    parser.add_argument('--audio', required=True)
-    parser.add_argument('--text', required=True)
-    parser.add_argument('--output', required=True)
-    args = parser.parse_args()
-    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+def fallback_generate(text: str, audio_file: str, output_file: str):
+    timeline = audio_timeline(audio_file) if np is not None else letter_timeline(text, audio_file)
+    Path(output_file).write_text(json.dumps(timeline, indent=2))
+
 
+def generate(text: str, audio_file: str, output_file: str):
     ok = False
     try:
-        ok = rhubarb_generate(args.audio, args.output)
+        ok = rhubarb_generate(audio_file, output_file)
     except Exception:
         ok = False
     if not ok:
-        fallback_generate(args.text, args.audio, args.output)
-    print(args.output)
+        fallback_generate(text, audio_file, output_file)
+
+
+def serve(infile, outfile, workers: int = 2, cache=None):
+    """
+    JSON-lines server: ``{"id", "audio", "text", "key"}`` is answered with
+    ``{"id", "lipsync", "cached"}``, the timeline stored in ``cache`` under the
+    audio's key. Streamed speech sends one request per chunk.
+    """
+    def handle(request, reply):
+        audio, text = request['audio'], request['text']
+        path, hit = cache.get_or_create(request['key'], lambda tmp: generate(text, audio, tmp))
+        reply({'lipsync': str(path), 'cached': hit})
+
+    serve_lines(handle, infile, outfile, workers)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--audio')
+    parser.add_argument('--text')
+    parser.add_argument('--output')
+    parser.add_argument('--key', help='cache key of the audio; the timeline is stored in the lipsync cache')
+    parser.add_argument('--serve', action='store_true', help='answer JSON-lines requests on stdin')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('LIPSYNC_WORKERS', '2')))
+    args = parser.parse_args()
+    if args.serve:
+        serve(sys.stdin, reply_stream(), args.workers, lipsync_cache())
+    elif not args.audio or not args.text or not (args.output or args.key):
+        parser.error('--audio, --text and --output or --key are required without --serve')
+    elif args.key:
+        path, _ = lipsync_cache().get_or_create(args.key, lambda tmp: generate(args.text, args.audio, tmp))
+        print(path)
+    else:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        generate(args.text, args.audio, args.output)
+        print(args.output)
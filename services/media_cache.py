@@ -0,0 +1,118 @@
+"""
+Content-addressed cache for synthesized speech and lipsync timelines.
+
+An artifact is stored as ``<key><suffix>``, where the key hashes everything
+that determines it (text, voice, engine), so a repeated line is served from
+disk instead of being synthesized again. Each directory is bounded in bytes:
+a hit refreshes the file's mtime and the least recently used files, cached or
+not, are evicted first.
+
+Environment:
+    MEDIA_CACHE_VOICES_BYTES   — size bound of assets/voices (default: 512 MiB)
+    MEDIA_CACHE_LIPSYNC_BYTES  — size bound of assets/lipsync (default: 64 MiB)
+"""
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent / 'assets'
+
+
+def cache_key(*parts) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()[:32]
+
+
+class MediaCache:
+    def __init__(self, directory, suffix: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None  # bytes on disk, counted on the first store
+
+    def path(self, key: str) -> Path:
+        return self.directory / f'{key}{self.suffix}'
+
+    def get(self, key: str):
+        """Path of the cached artifact, marked as recently used; None on a miss."""
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, produce) -> Path:
+        """Run ``produce(tmp_path)`` and store the file it writes under ``key``."""
+        tmp = self.temp_path(key)
+        try:
+            produce(str(tmp))
+            return self.store(key, tmp)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+
+    def temp_path(self, key: str) -> Path:
+        """A private path in the cache directory to write an artifact before it is stored."""
+        return self.directory / f'.{key}.{os.getpid()}.{threading.get_ident()}{self.suffix}'
+
+    def store(self, key: str, src) -> Path:
+        """Move the file at ``src`` (see ``temp_path``) into the cache under ``key``."""
+        path = self.path(key)
+        os.replace(src, path)
+        self._stored(path.stat().st_size)
+        return path
+
+    def get_or_create(self, key: str, produce):
+        """``(path, hit)``; ``produce`` only runs on a miss."""
+        path = self.get(key)
+        if path is not None:
+            return path, True
+        return self.put(key, produce), False
+
+    def evict(self) -> int:
+        """Delete the least recently used files until the directory fits; returns how many."""
+        with self._lock:
+            files = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and entry.name.endswith(self.suffix) and not entry.name.startswith('.'):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+            files.sort()
+            size = sum(f[1] for f in files)
+            removed = 0
+            for _, file_size, file_path in files[:-1]:  # never the newest
+                if size <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(file_path)
+                except FileNotFoundError:
+                    pass
+                size -= file_size
+                removed += 1
+            self._size = size
+            return removed
+
+    def _stored(self, nbytes: int) -> None:
+        with self._lock:
+            over = self._size is None or self._size + nbytes > self.max_bytes
+            if not over:
+                self._size += nbytes
+        if over:
+            self.evict()
+
+
+def voices_cache() -> MediaCache:
+    return MediaCache(ASSETS_DIR / 'voices', '.wav',
+                      int(os.environ.get('MEDIA_CACHE_VOICES_BYTES', str(512 * 1024 * 1024))))
+
+
+def lipsync_cache() -> MediaCache:
+    return MediaCache(ASSETS_DIR / 'lipsync', '.json',
+                      int(os.environ.get('MEDIA_CACHE_LIPSYNC_BYTES', str(64 * 1024 * 1024))))
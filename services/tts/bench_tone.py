@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the tone fallback in tts_service.py.
+
+Times the original per-sample writer (one struct.pack and one writeframes
+call per sample) against the batched ``generate_tone_wav``, with NumPy and
+with the ``array('h')`` path, for the longest (8 s) clip.
+
+Usage:
+    python bench_tone.py --repeat 5
+"""
+
+import argparse
+import io
+import math
+import struct
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import tts_service
+
+TEXT = 'x' * 200  # clamps to the 8 s maximum
+
+
+def per_sample_tone_wav(text: str, output_path):
+    """The original implementation, kept as the baseline."""
+    duration = max(1.2, min(8.0, len(text) * 0.05))
+    sample_rate = 22050
+    freq = 220
+    total = int(sample_rate * duration)
+    with wave.open(output_path, 'w') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        for n in range(total):
+            env = 0.35 * (1 - (n / total) * 0.3)
+            val = int(32767 * env * math.sin(2 * math.pi * freq * n / sample_rate))
+            wav.writeframes(struct.pack('<h', val))
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'tone.wav')
+        numpy = tts_service.np
+        results = [('per-sample writeframes', best_of(lambda: per_sample_tone_wav(TEXT, path), args.repeat))]
+        if numpy is not None:
+            results.append(('numpy, one writeframes', best_of(lambda: tts_service.generate_tone_wav(TEXT, path), args.repeat)))
+            results.append(('numpy, in memory', best_of(lambda: tts_service.generate_tone_wav(TEXT, io.BytesIO()), args.repeat)))
+        tts_service.np = None
+        try:
+            results.append(("array('h'), one writeframes", best_of(lambda: tts_service.generate_tone_wav(TEXT, path), args.repeat)))
+        finally:
+            tts_service.np = numpy
+
+    baseline = results[0][1]
+    for name, seconds in results:
+        print(f"{name:30s} {seconds * 1000:9.1f} ms  {baseline / seconds:6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
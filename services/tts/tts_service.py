@@ -1,50 +1,163 @@
 #!/usr/bin/env python3
 import argparse
 import math
-import struct
+import os
+import re
+import shutil
 import subprocess
+import sys
+import threading
 import wave
+from array import array
 from pathlib import Path
 
+try:
+    import numpy as np  # type: ignore
+except ImportError:
+    np = None
 
-def generate_tone_wav(text: str, output_path: str):
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from json_lines import reply_stream, serve_lines  # noqa: E402
+from media_cache import cache_key, voices_cache  # noqa: E402
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+
+
+TONE_SAMPLE_RATE = 22050
+TONE_FREQ = 220
+
+
+def tone_pcm(text: str, sample_rate: int = TONE_SAMPLE_RATE) -> bytes:
+    """16-bit little-endian mono PCM of the fallback tone for ``text``, built in one pass."""
     duration = max(1.2, min(8.0, len(text) * 0.05))
-    sample_rate = 22050
-    freq = 220
     total = int(sample_rate * duration)
-    with wave.open(output_path, 'w') as wav:
+    if np is not None:
+        n = np.arange(total, dtype=np.float64)
+        env = 0.35 * (1 - (n / total) * 0.3)
+        return (32767 * env * np.sin(2 * math.pi * TONE_FREQ * n / sample_rate)).astype('<i2').tobytes()
+    samples = array('h', (int(32767 * (0.35 * (1 - (n / total) * 0.3)) * math.sin(2 * math.pi * TONE_FREQ * n / sample_rate))
+                          for n in range(total)))
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def generate_tone_wav(text: str, output_path):
+    """Write the fallback tone as a WAV file; ``output_path`` may also be a binary file object."""
+    with wave.open(output_path, 'wb') as wav:
         wav.setnchannels(1)
         wav.setsampwidth(2)
-        wav.setframerate(sample_rate)
-        for n in range(total):
-            env = 0.35 * (1 - (n / total) * 0.3)
-            val = int(32767 * env * math.sin(2 * math.pi * freq * n / sample_rate))
-            wav.writeframes(struct.pack('<h', val))
+        wav.setframerate(TONE_SAMPLE_RATE)
+        wav.writeframes(tone_pcm(text))
 
 
-def synthesize(text: str, output_path: str, voice: str = 'en'):
+def load_coqui():
+    """The Coqui model, or None when it is not installed or fails to load."""
     try:
         from TTS.api import TTS  # type: ignore
-        tts = TTS(model_name='tts_models/en/ljspeech/tacotron2-DDC', progress_bar=False)
-        tts.tts_to_file(text=text, file_path=output_path)
-        return 'coqui'
+        return TTS(model_name='tts_models/en/ljspeech/tacotron2-DDC', progress_bar=False)
     except Exception:
-        pass
+        return None
 
-    try:
-        subprocess.run(['espeak', '-v', voice, '-w', output_path, text], check=True)
-        return 'espeak'
-    except Exception:
+
+class Synthesizer:
+    """Loads the engines once; Coqui, then espeak, then the tone fallback."""
+
+    def __init__(self):
+        self.coqui = load_coqui()
+        self.espeak = shutil.which('espeak')
+        self._coqui_lock = threading.Lock()  # one model instance, not thread-safe
+
+    @property
+    def engine(self) -> str:
+        """The preferred engine; ``synthesize`` returns the one actually used."""
+        return 'coqui' if self.coqui is not None else 'espeak' if self.espeak else 'tone-fallback'
+
+    def synthesize(self, text: str, output_path: str, voice: str = 'en') -> str:
+        if self.coqui is not None:
+            try:
+                with self._coqui_lock:
+                    self.coqui.tts_to_file(text=text, file_path=output_path)
+                return 'coqui'
+            except Exception:
+                pass
+        if self.espeak:
+            try:
+                subprocess.run([self.espeak, '-v', voice, '-w', output_path, text], check=True)
+                return 'espeak'
+            except Exception:
+                pass
         generate_tone_wav(text, output_path)
         return 'tone-fallback'
 
 
+def synthesize(text: str, output_path: str, voice: str = 'en'):
+    return Synthesizer().synthesize(text, output_path, voice)
+
+
+def split_sentences(text: str) -> list:
+    """Sentences of ``text``, each keeping its closing punctuation."""
+    return [s for s in _SENTENCE_RE.split(text.strip()) if s] or [text]
+
+
+def serve(synth: Synthesizer, infile, outfile, workers: int = 2, cache=None):
+    """
+    JSON-lines server: each request line ``{"id", "text", "voice", "output"}``
+    is answered, possibly out of order, with ``{"id", "engine"}`` or
+    ``{"id", "error"}``. At most ``workers`` utterances are synthesized at once.
+
+    Without ``output`` the utterance goes through ``cache`` and the reply adds
+    ``key``, ``audio`` (the cached file) and ``cached``. With ``"stream": true``
+    it is synthesized a sentence at a time: one ``{"id", "chunk", "chunks",
+    "text", "engine", "key", "audio", "cached"}`` reply per sentence as soon
+    as it is ready, then ``{"id", "chunks"}``.
+    """
+    def cached(text, voice):
+        key = cache_key(text, voice, synth.engine)
+        path = cache.get(key)
+        if path is not None:
+            return {'engine': synth.engine, 'key': key, 'audio': str(path), 'cached': True}
+        tmp = cache.temp_path(key)
+        try:
+            engine = synth.synthesize(text, str(tmp), voice)
+            # Audio from a fallback engine is keyed by that engine, so the preferred one is retried next time.
+            key = cache_key(text, voice, engine)
+            path = cache.store(key, tmp)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        return {'engine': engine, 'key': key, 'audio': str(path), 'cached': False}
+
+    def handle(request, reply):
+        text, voice = request['text'], request.get('voice') or 'en'
+        if 'output' in request:
+            Path(request['output']).parent.mkdir(parents=True, exist_ok=True)
+            reply({'engine': synth.synthesize(text, request['output'], voice)})
+        elif request.get('stream'):
+            sentences = split_sentences(text)
+            for i, sentence in enumerate(sentences):
+                reply({'chunk': i, 'chunks': len(sentences), 'text': sentence, **cached(sentence, voice)})
+            reply({'chunks': len(sentences)})
+        else:
+            reply(cached(text, voice))
+
+    serve_lines(handle, infile, outfile, workers)
+
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
-    parser.add_argument('--text', required=True)
+    parser.add_argument('--text')
     parser.add_argument('--voice', default='en')
-    parser.add_argument('--output', required=True)
+    parser.add_argument('--output')
+    parser.add_argument('--serve', action='store_true', help='answer JSON-lines requests on stdin')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('TTS_WORKERS', '2')))
     args = parser.parse_args()
-    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
-    engine = synthesize(args.text, args.output, args.voice)
-    print(engine)
+    if args.serve:
+        replies = reply_stream()
+        serve(Synthesizer(), sys.stdin, replies, args.workers, voices_cache())
+    else:
+        if not args.text or not args.output:
+            parser.error('--text and --output are required without --serve')
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        engine = synthesize(args.text, args.output, args.voice)
+        print(engine)
@@ -0,0 +1,80 @@
+import itertools
+import os
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "server"))
+sys.path.insert(0, str(ROOT / "services"))
+sys.path.insert(0, str(ROOT / "services" / "tts"))
+sys.path.insert(0, str(ROOT / "services" / "lipsync"))
+
+os.environ.setdefault("google_client_id", "test-client-id")
+os.environ.setdefault("google_client_secret", "test-client-secret")
+
+
+@pytest.fixture
+def camel_app(monkeypatch):
+    """Flask app with the rp blueprint on an in-memory database and a logged-in admin."""
+    from flask import Flask
+    from flask_login import LoginManager
+    from langchain.chat_models.base import SimpleChatModel
+
+    import agent_convo
+    import llm_clients
+    from database import db, Admin
+
+    calls = itertools.count(1)
+
+    class FakeChatModel(SimpleChatModel):
+        """Deterministic stand-in for ChatOpenAI."""
+
+        temperature: float = 0.0
+        streaming: bool = False
+        openai_api_key: str = None
+        model_name: str = "fake"
+        model_kwargs: dict = {}
+
+        @property
+        def _llm_type(self):
+            return "fake"
+
+        def _call(self, messages, stop=None):
+            n = next(calls)
+            if "Solution" in messages[-1].content:
+                reply = f"Instruction: step {n}\nInput: None"
+            else:
+                reply = f"Solution: answer {n} Next request."
+            if self.streaming:
+                for token in re.findall(r"\S+\s*", reply):
+                    self.callback_manager.on_llm_new_token(token, verbose=self.verbose)
+            return reply
+
+        async def _agenerate(self, messages, stop=None):
+            return self._generate(messages, stop=stop)
+
+    monkeypatch.setattr(llm_clients, "ChatOpenAI", FakeChatModel)
+    llm_clients.clear_pool()
+
+    app = Flask("camel_test")
+    app.secret_key = "test"
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    app.register_blueprint(agent_convo.rp)
+    login_manager = LoginManager(app)
+    login_manager.user_loader(lambda user_id: Admin.query.filter_by(id=user_id).first())
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(Admin(id="admin-1", email="a@example.com", openai_key="sk-test"))
+        db.session.commit()
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["_user_id"] = "admin-1"
+            sess["_fresh"] = True
+        app.client = client
+        yield app
+        db.session.remove()
@@ -0,0 +1,225 @@
+import codecs
+import json
+import pickle
+import time
+
+from langchain.schema import AIMessage, HumanMessage, SystemMessage
+
+import agent_convo
+from database import db, Agent_Message, Agent_Session
+from session_store import convert_pickled_session, load_histories, migrate_pickled_sessions
+
+
+def _start(client, sess_id=0):
+    resp = client.post("/rp/start", json={"role1": "Coder", "role2": "Trader", "task": "Build a bot", "sessId": sess_id})
+    assert resp.status_code == 200
+    return resp.get_json()
+
+
+def test_turns_append_only_new_rows(camel_app):
+    first = _start(camel_app.client)
+    sess_id = first["sessId"]
+    assert Agent_Message.query.filter_by(session_id=sess_id, speaker="user").count() == 3
+    assert Agent_Message.query.filter_by(session_id=sess_id, speaker="assistant").count() == 5
+
+    _start(camel_app.client, sess_id)
+    rows = Agent_Message.query.filter_by(session_id=sess_id, turn=1).all()
+    assert len(rows) == 4
+    assert db.session.get(Agent_Session, sess_id).turns == 2
+
+    histories = load_histories(db.session.get(Agent_Session, sess_id))
+    assert [m.type for m in histories["assistant"]] == ["system", "human", "ai", "human", "ai", "human", "ai"]
+
+
+def _pickle(store):
+    return codecs.encode(pickle.dumps(store), "base64").decode()
+
+
+def test_pickled_sessions_are_converted(camel_app):
+    user_store = [SystemMessage(content="u-sys"), HumanMessage(content="go"), AIMessage(content="Instruction: a")]
+    assistant_store = [SystemMessage(content="a-sys"), HumanMessage(content="intro"), AIMessage(content="ok"),
+                       HumanMessage(content="Instruction: a"), AIMessage(content="Solution: b")]
+    legacy = Agent_Session(role_1="Coder", role_2="Trader", task="t", admin_id="admin-1",
+                           user_store=_pickle(user_store), assistant_store=_pickle(assistant_store))
+    db.session.add(legacy)
+    db.session.commit()
+
+    assert migrate_pickled_sessions() == 1
+    assert legacy.user_store == "" and legacy.turns == 1
+    assert not convert_pickled_session(legacy)
+    histories = load_histories(legacy)
+    assert [m.content for m in histories["user"]] == ["u-sys", "go", "Instruction: a"]
+    assert isinstance(histories["assistant"][-1], AIMessage)
+
+    chat = camel_app.client.get(f"/rp/get_chat?sessId={legacy.id}").get_json()
+    assert [(m["role"], m["msg"]) for m in chat["messages"]] == [(1, "ok"), (0, "a"), (1, "b")]
+
+
+def test_get_chat_cursor_and_etag(camel_app):
+    sess_id = _start(camel_app.client)["sessId"]
+    _start(camel_app.client, sess_id)
+
+    full = camel_app.client.get(f"/rp/get_chat?sessId={sess_id}")
+    messages = full.get_json()["messages"]
+    assert [m["role"] for m in messages] == [1, 0, 1, 0, 1]
+
+    page = camel_app.client.get(f"/rp/get_chat?sessId={sess_id}&limit=2").get_json()
+    assert page["messages"] == messages[:2] and page["hasMore"]
+    rest = camel_app.client.get(f"/rp/get_chat?sessId={sess_id}&after={page['after']}").get_json()
+    assert rest["messages"] == messages[2:] and not rest["hasMore"]
+
+    etag = full.headers["ETag"]
+    cached = camel_app.client.get(f"/rp/get_chat?sessId={sess_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    _start(camel_app.client, sess_id)
+    changed = camel_app.client.get(f"/rp/get_chat?sessId={sess_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and len(changed.get_json()["messages"]) == 7
+
+
+def _events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n")
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_start_stream_emits_tokens_then_saves_turn(camel_app):
+    resp = camel_app.client.post("/rp/start_stream", json={"role1": "Coder", "role2": "Trader", "task": "Build a bot", "sessId": 0})
+    assert resp.mimetype == "text/event-stream"
+    events = _events(resp.get_data(as_text=True))
+    names = [name for name, _ in events]
+    assert names[0] == "session" and names[-1] == "done"
+    assert names.count("user_token") > 1 and names.count("assistant_token") > 1
+
+    user_tokens = "".join(data["token"] for name, data in events if name == "user_token")
+    done = events[-1][1]
+    assert done["userMsg"] == user_tokens.replace("Instruction: ", "").replace("Input: None", "")
+    assert db.session.get(Agent_Session, done["sessId"]).turns == 1
+    assert Agent_Message.query.filter_by(session_id=done["sessId"], speaker="assistant").count() == 5
+
+
+def _wait_for_job(client, job_id):
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        job = client.get(f"/rp/jobs/{job_id}").get_json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError("job did not finish")
+
+
+def test_job_runs_turns_in_background(camel_app):
+    resp = camel_app.client.post("/rp/jobs", json={"role1": "Coder", "role2": "Trader", "task": "Build a bot", "sessId": 0, "turns": 3})
+    assert resp.status_code == 202
+    job = _wait_for_job(camel_app.client, resp.get_json()["jobId"])
+    assert job["status"] == "done", job
+    assert job["turnsCompleted"] == 3
+
+    session = db.session.get(Agent_Session, job["sessId"])
+    db.session.refresh(session)
+    assert session.turns == 3
+    assert Agent_Message.query.filter_by(session_id=session.id, speaker="assistant").count() == 9
+    assert [j["jobId"] for j in camel_app.client.get("/rp/jobs").get_json()["jobs"]] == [job["jobId"]]
+
+
+def test_rolling_history_keeps_prompt_bounded():
+    from history_policy import RollingSummaryHistory, SUMMARY_PREFIX
+    from tokens import count_message_tokens
+
+    policy = RollingSummaryHistory(keep_turns=2, token_budget=400, summary_tokens=80)
+    messages = [SystemMessage(content="You are a coder.")]
+    sizes = []
+    for n in range(60):
+        messages.append(HumanMessage(content=f"Instruction: write module {n}. " + "Details follow. " * 20))
+        prompt = policy.prompt(messages)
+        sizes.append(count_message_tokens(prompt))
+        messages.append(AIMessage(content=f"Solution: module {n} is done. Next request."))
+
+    assert max(sizes) <= 400
+    assert prompt[0] is messages[0] and prompt[-1] is messages[-2]
+    assert prompt[1].content.startswith(SUMMARY_PREFIX) and "module 57" in prompt[1].content
+
+    restored = RollingSummaryHistory(keep_turns=2, token_budget=400, summary_tokens=80, state=policy.state())
+    assert restored.prompt(messages + [HumanMessage(content="next")])[1].content.startswith(SUMMARY_PREFIX)
+
+
+def test_chat_models_are_pooled_per_key_and_model(camel_app):
+    from llm_clients import get_chat_model
+
+    model = get_chat_model("sk-one", 0.2, "gpt-4")
+    assert get_chat_model("sk-one", 0.2, "gpt-4") is model
+    assert get_chat_model("sk-two", 0.2, "gpt-4") is not model
+    assert get_chat_model("sk-one", 0.2, "gpt-3.5-turbo") is not model
+    assert model.model_kwargs["api_key"] == "sk-one"
+
+
+def test_task_specifier_cache(camel_app, monkeypatch, tmp_path):
+    import agent_convo
+    from specifier_cache import make_cache
+
+    for spec in ("memory", f"sqlite:///{tmp_path / 'specifier.db'}"):
+        monkeypatch.setattr(agent_convo, "specifier_cache", make_cache(spec))
+        first = agent_convo.starting_convo("Coder", "Trader", "Build a bot", "sk-test")[0]
+        assert agent_convo.starting_convo("Coder", "Trader", "Build a bot", "sk-test")[0] == first
+        assert agent_convo.starting_convo("Coder", "Trader", "Build a game", "sk-test")[0] != first
+
+
+def test_search_finds_own_chat_messages(camel_app, monkeypatch):
+    import session_store
+    from search_index import SearchIndex
+
+    index = SearchIndex()
+    monkeypatch.setattr(session_store, "search_index", index)
+    monkeypatch.setattr(agent_convo, "search_index", index)
+    sess_id = _start(camel_app.client)["sessId"]
+
+    found = camel_app.client.get("/rp/search?q=answer").get_json()
+    assert found["results"] and {r["sessId"] for r in found["results"]} == {sess_id}
+    assert found["results"][0]["role"] == 1 and "[answer]" in found["results"][0]["snippet"]
+
+    index.clear("camel")
+    assert session_store.reindex_sessions() == 1
+    assert camel_app.client.get("/rp/search?q=answer").get_json()["results"]
+    index.add([("camel", "someone-else", sess_id, 999, "ai", "secret answer")])
+    assert all(r["id"] != 999 for r in camel_app.client.get("/rp/search?q=secret").get_json()["results"])
+
+
+def test_manual_turns_conflict_with_running_job(camel_app):
+    import threading
+    from camel_jobs import job_queue
+
+    sess_id = _start(camel_app.client)["sessId"]
+    release = threading.Event()
+    job = job_queue.submit(lambda job: release.wait(5), "admin-1", sessId=sess_id)
+    try:
+        body = {"role1": "Coder", "role2": "Trader", "task": "Build a bot", "sessId": sess_id}
+        assert camel_app.client.post("/rp/start", json=body).status_code == 409
+        assert camel_app.client.post("/rp/start_stream", json=body).status_code == 409
+        assert camel_app.client.post("/rp/jobs", json=body).status_code == 409
+    finally:
+        release.set()
+    _wait_for_job(camel_app.client, job.id)
+    assert camel_app.client.post("/rp/jobs", json={**body, "turns": "many"}).status_code == 400
+    assert camel_app.client.post("/rp/jobs", json={**body, "turns": -1}).status_code == 400
+
+
+def test_exclusive_submit_admits_one_job_per_session():
+    import threading
+    from camel_jobs import JobQueue
+
+    queue, release, jobs = JobQueue(max_workers=2), threading.Event(), []
+    barrier = threading.Barrier(8)
+
+    def submit():
+        barrier.wait()
+        jobs.append(queue.submit(lambda job: release.wait(5), "admin-1", exclusive=("sessId",), sessId=7))
+
+    threads = [threading.Thread(target=submit) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    release.set()
+    assert len([j for j in jobs if j is not None]) == 1
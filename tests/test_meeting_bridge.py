@@ -0,0 +1,161 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from meeting_bridge.cache import ReadThroughCache
+from meeting_bridge.transport import CircuitBreaker, Transport
+
+
+@pytest.fixture
+def upstream():
+    """Local stand-in for Devika; ``statuses`` is consumed one per request, then 200."""
+    calls = []
+    statuses = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self):
+            calls.append((self.command, self.path))
+            status = statuses.pop(0) if statuses else 200
+            body = json.dumps({"path": self.path}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = do_DELETE = _reply
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.calls, server.statuses = calls, statuses
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_transport_retries_idempotent_calls_only(upstream):
+    transport = Transport(upstream.url, retries=2, backoff=0.001)
+    upstream.statuses.extend([503, 502])
+    assert transport.request("GET", "/api/meetings") == ({"path": "/api/meetings"}, 200)
+    assert len(upstream.calls) == 3
+
+    upstream.statuses.append(503)
+    data, code = transport.request("POST", "/api/meetings", {"title": "x"})
+    assert code == 503
+    assert len(upstream.calls) == 4
+    assert transport.stats()["circuit"] == "closed"
+
+
+def test_circuit_breaker_fails_fast_then_recovers(upstream):
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=5, clock=lambda: now[0])
+    transport = Transport(upstream.url, retries=0, breaker=breaker)
+
+    upstream.statuses.extend([503, 503])
+    transport.request("GET", "/api/status")
+    transport.request("GET", "/api/status")
+    assert breaker.state == "open"
+
+    data, code = transport.request("GET", "/api/status")
+    assert code == 503 and "circuit open" in data["error"]
+    assert len(upstream.calls) == 2
+
+    now[0] = 6.0
+    assert breaker.state == "half-open"
+    assert transport.request("GET", "/api/status")[1] == 200
+    assert breaker.state == "closed"
+
+
+def test_failed_half_open_trial_reopens_the_circuit(upstream, monkeypatch):
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=lambda: now[0])
+    transport = Transport(upstream.url, retries=0, breaker=breaker)
+    upstream.statuses.append(503)
+    transport.request("GET", "/api/status")
+    assert breaker.state == "open"
+
+    def broken(*args, **kwargs):
+        raise requests.exceptions.ChunkedEncodingError("truncated body")
+
+    now[0] = 6.0
+    with monkeypatch.context() as m:
+        m.setattr(transport.session, "request", broken)
+        data, code = transport.request("GET", "/api/status")
+    assert code == 503 and data["error"] == "Cannot reach Devika meeting server"
+    assert breaker.state == "open"
+
+    now[0] = 12.0
+    assert transport.request("GET", "/api/status")[1] == 200
+    assert breaker.state == "closed"
+
+
+def test_unreachable_upstream_returns_503():
+    transport = Transport("http://127.0.0.1:9", retries=1, backoff=0.001,
+                          breaker=CircuitBreaker(failure_threshold=2))
+    data, code = transport.request("GET", "/api/status")
+    assert code == 503 and data["error"] == "Cannot reach Devika meeting server"
+    assert transport.breaker.state == "open"
+
+
+def test_read_through_cache_serves_stale_and_invalidates():
+    now = [0.0]
+    fetched = []
+
+    def fetch(path):
+        fetched.append(path)
+        return {"n": len(fetched)}, 200
+
+    cache = ReadThroughCache(fetch, stale=10, clock=lambda: now[0])
+    assert cache.get("/api/meetings", ttl=2) == ({"n": 1}, 200, "MISS")
+    assert cache.get("/api/meetings", ttl=2) == ({"n": 1}, 200, "HIT")
+
+    now[0] = 3.0
+    assert cache.get("/api/meetings", ttl=2) == ({"n": 1}, 200, "STALE")
+    for _ in range(200):  # background refresh
+        data, code, state = cache.get("/api/meetings", ttl=2)
+        if state == "HIT":
+            break
+        time.sleep(0.01)
+    assert (data, state) == ({"n": 2}, "HIT")
+
+    cache.invalidate("/api/meetings")
+    assert cache.get("/api/meetings", ttl=2) == ({"n": 3}, 200, "MISS")
+    assert cache.stats()["stale_hits"] >= 1
+
+    now[0] = 20.0
+    assert cache.get("/api/meetings", ttl=2)[2] == "MISS"
+
+
+def test_refresh_started_before_invalidation_is_dropped():
+    now = [0.0]
+    started, release = threading.Event(), threading.Event()
+    fetched = []
+
+    def fetch(path):
+        fetched.append(path)
+        if len(fetched) == 2:  # the background refresh: answers with pre-mutation data
+            started.set()
+            release.wait(5)
+            return {"n": "old"}, 200
+        return {"n": len(fetched)}, 200
+
+    cache = ReadThroughCache(fetch, stale=10, clock=lambda: now[0])
+    cache.get("/api/meetings", ttl=2)
+    now[0] = 3.0
+    assert cache.get("/api/meetings", ttl=2)[2] == "STALE"
+    assert started.wait(5)
+    cache.invalidate("/api/meetings")
+    release.set()
+    for _ in range(100):
+        if not cache._refreshing:
+            break
+        time.sleep(0.01)
+    assert cache.get("/api/meetings", ttl=2) == ({"n": 3}, 200, "MISS")
@@ -0,0 +1,365 @@
+import json
+import os
+import queue
+import sqlite3
+import time
+
+import pytest
+from flask import Flask, jsonify
+
+import agent_responders
+import meeting_events
+import paulis_place
+from tokens import count_tokens
+from agent_registry import AgentRegistry
+from agent_responders import StubResponder
+from meeting_archive import MeetingArchive
+from meeting_context import MeetingContexts
+from meeting_store import MemoryMeetingStore, SQLiteMeetingStore
+from search_index import SearchIndex
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def client(request, tmp_path, monkeypatch):
+    if request.param == "memory":
+        store = MemoryMeetingStore()
+    else:
+        store = SQLiteMeetingStore(str(tmp_path / "meetings.db"))
+    monkeypatch.setattr(paulis_place, "store", store)
+    app = Flask(__name__)
+    app.register_blueprint(paulis_place.paulis_place_bp)
+    client = app.test_client()
+    client.store = store
+    return client
+
+
+def test_meeting_lifecycle(client):
+    meeting = client.post("/api/meetings", json={"title": "Standup", "agenda": "Ship it"}).get_json()["meeting"]
+    mid = meeting["id"]
+    assert client.post(f"/api/meetings/{mid}/start").get_json()["meeting"]["status"] == "in_progress"
+    client.post(f"/api/meetings/{mid}/messages", json={"agent_id": "alex", "content": "On it"})
+    client.post(f"/api/meetings/{mid}/agent-discuss", json={"agents": ["devika", "pauli"]})
+    assert client.post(f"/api/meetings/{mid}/end").get_json()["meeting"]["status"] == "ended"
+
+    msgs = client.get(f"/api/meetings/{mid}/messages").get_json()["messages"]
+    assert [m["agent_id"] for m in msgs] == ["system", "devika", "alex", "devika", "system"]
+    assert msgs[-1]["content"].startswith("Meeting ended. 4 messages exchanged.")
+    assert msgs[2]["agent_name"] == "Alex"
+    assert client.get("/api/meetings").get_json()["meetings"][0]["id"] == mid
+    assert client.get("/api/meetings?status=ended").get_json()["meetings"][0]["id"] == mid
+    assert client.get("/api/status").get_json()["meetings_count"] == 1
+    assert client.post("/api/meetings/missing/start").status_code == 404
+
+
+def test_sqlite_store_is_shared_and_durable(tmp_path):
+    path = str(tmp_path / "meetings.db")
+    first, second = SQLiteMeetingStore(path), SQLiteMeetingStore(path)
+    first.create_meeting({"id": "m1", "created_at": "2024-01-01T00:00:00+00:00", "status": "draft"})
+    first.append_message("m1", {"id": "x", "timestamp": "2024-01-01T00:00:01+00:00", "content": "hi"})
+    assert second.update_meeting("m1", status="in_progress")["status"] == "in_progress"
+    assert first.get_meeting("m1")["status"] == "in_progress"
+    assert SQLiteMeetingStore(path).get_messages("m1")[0]["content"] == "hi"
+
+
+@pytest.mark.parametrize("make", [
+    lambda tmp: MemoryMeetingStore(keep_ended=2, ended_ttl=3600),
+    lambda tmp: SQLiteMeetingStore(str(tmp / "m.db"), keep_ended=2, ended_ttl=3600),
+])
+def test_prune_ended_keeps_newest_within_ttl(make, tmp_path):
+    store = make(tmp_path)
+    now = paulis_place._now()
+    for i, ended_at in enumerate(["2000-01-01T00:00:00+00:00", now, now, now, None]):
+        store.create_meeting({"id": f"m{i}", "created_at": now, "status": "ended" if ended_at else "draft",
+                              "ended_at": ended_at})
+        store.append_message(f"m{i}", {"id": f"x{i}", "timestamp": now})
+    pruned = store.prune_ended()
+    assert len(pruned) == 2 and "m0" in pruned
+    assert store.count_meetings() == 3
+    assert store.get_meeting("m4") is not None
+    assert store.count_messages("m0") == 0
+
+
+def test_messages_cursor_pagination(client):
+    mid = client.post("/api/meetings", json={"title": "Poll"}).get_json()["meeting"]["id"]
+    for i in range(5):
+        client.post(f"/api/meetings/{mid}/messages", json={"content": f"m{i}"})
+    url = f"/api/meetings/{mid}/messages"
+
+    page = client.get(f"{url}?limit=4").get_json()
+    assert [m["content"] for m in page["messages"][1:]] == ["m0", "m1", "m2"]
+    assert page["has_more"]
+
+    page = client.get(f"{url}?since_id={page['next_cursor']}&limit=4").get_json()
+    assert [m["content"] for m in page["messages"]] == ["m3", "m4"]
+    assert not page["has_more"]
+
+    empty = client.get(f"{url}?since_id={page['next_cursor']}").get_json()
+    assert empty["messages"] == [] and empty["next_cursor"] == page["next_cursor"]
+
+    ts = page["messages"][0]["timestamp"]
+    assert all(m["timestamp"] > ts for m in client.get(url, query_string={"since_ts": ts}).get_json()["messages"])
+    assert client.get(f"{url}?since_id=nope").status_code == 400
+
+
+def _events(chunks, stop):
+    events = []
+    for chunk in chunks:
+        if chunk.startswith(b"event:") or b"\nevent:" in chunk:
+            fields = dict(line.split(": ", 1) for line in chunk.decode().strip().split("\n"))
+            events.append((fields["event"], json.loads(fields["data"])))
+            if stop(events[-1]):
+                break
+    return events
+
+
+def test_stream_replays_then_pushes_live_events(client):
+    mid = client.post("/api/meetings", json={"title": "Live"}).get_json()["meeting"]["id"]
+    first = client.get(f"/api/meetings/{mid}/messages").get_json()["messages"][0]
+    client.post(f"/api/meetings/{mid}/messages", json={"content": "missed"})
+
+    resp = client.get(f"/api/meetings/{mid}/stream", headers={"Last-Event-ID": first["id"]}, buffered=False)
+    assert resp.mimetype == "text/event-stream"
+    client.post(f"/api/meetings/{mid}/messages", json={"content": "live"})
+    client.post(f"/api/meetings/{mid}/end")
+
+    events = _events(resp.response, lambda e: e[0] == "message" and e[1]["agent_id"] == "system")
+    resp.close()
+    assert [(e, d.get("content", d.get("status"))) for e, d in events[:3]] == [
+        ("message", "missed"), ("message", "live"), ("status", "ended")]
+    assert events[3][1]["content"].startswith("Meeting ended.")
+    assert meeting_events.broker.subscriber_count(mid) == 0
+
+
+def test_broker_cuts_off_slow_subscribers():
+    broker = meeting_events.MeetingBroker(maxsize=2)
+    slow, fast = broker.subscribe("m"), broker.subscribe("m")
+    for i in range(3):
+        broker.publish("m", "message", i)
+        fast.get(timeout=0)
+    assert slow.overflowed and broker.subscriber_count("m") == 1
+    assert [slow.get(timeout=1), slow.get(timeout=1)] == [("message", 0), ("message", 1)]
+    with pytest.raises(queue.Empty):
+        slow.get(timeout=1)
+
+
+def test_agent_discuss_fans_out_with_deadline(client, monkeypatch):
+    delays = {"devika": 0.3, "alex": 0.1, "darya": 2.0, "synthia": 0.2}
+    monkeypatch.setattr(agent_responders, "responder_for", lambda agent: StubResponder(delays[agent["id"]]))
+    monkeypatch.setattr(agent_responders, "DISCUSS_DEADLINE", 0.6)
+    mid = client.post("/api/meetings", json={"title": "Fan-out"}).get_json()["meeting"]["id"]
+
+    started = time.monotonic()
+    body = client.post(f"/api/meetings/{mid}/agent-discuss",
+                       json={"topic": "launch", "agents": list(delays)}).get_json()
+    assert time.monotonic() - started < 1.0
+    assert [r["agent_id"] for r in body["responses"]] == ["devika", "alex", "synthia"]
+    assert body["missed"] == {"darya": "timeout"}
+    assert "Noted 'launch'" in body["responses"][0]["content"]
+
+
+def test_discuss_round_waits_only_for_the_agent_timeout(monkeypatch):
+    delays = {"devika": 0.05, "darya": 3.0}
+    monkeypatch.setattr(agent_responders, "responder_for", lambda agent: StubResponder(delays[agent["id"]]))
+    agents = [{"id": agent_id, "name": agent_id} for agent_id in delays]
+    envelope = lambda agent: {"payload": {"subject": "launch"}}
+
+    started = time.monotonic()
+    replies, missed = agent_responders.discuss(agents, envelope, timeout=0.3, deadline=10)
+    assert time.monotonic() - started < 0.8
+    assert [agent["id"] for agent, _ in replies] == ["devika"] and missed == {"darya": "timeout"}
+
+
+def test_agent_registry_views_and_hot_reload(client, tmp_path):
+    with Flask(__name__).app_context():
+        expected = jsonify({"agents": [a for a in paulis_place.FLEET_AGENTS if a["status"] != "hidden"]})
+    assert client.get("/api/agents").data == expected.data
+    assert len(client.get("/api/agents?show_hidden=true").get_json()["agents"]) == len(paulis_place.FLEET_AGENTS)
+
+    fleet = tmp_path / "fleet.json"
+    fleet.write_text(json.dumps([{"id": "nova", "name": "Nova", "status": "online"}]))
+    now = [0.0]
+    registry = AgentRegistry(paulis_place.FLEET_AGENTS, path=str(fleet), check_interval=1, clock=lambda: now[0])
+    assert registry.get("nova")["name"] == "Nova" and registry.get("devika") is None
+    with pytest.raises(TypeError):
+        registry.get("nova")["name"] = "x"
+
+    fleet.write_text(json.dumps({"agents": [{"id": "orion", "name": "Orion", "status": "hidden"}]}))
+    os.utime(fleet, ns=(1, 1))
+    assert registry.get("nova") is not None  # not re-checked yet
+    now[0] = 2.0
+    assert registry.get("orion")["name"] == "Orion" and registry.agents() == ()
+
+    fleet.write_text("{broken")
+    os.utime(fleet, ns=(2, 2))
+    now[0] = 4.0
+    assert len(registry) == 1 and registry.last_error.startswith("JSONDecodeError")
+
+
+def test_meeting_list_pages_and_filters(client):
+    ids = [client.post("/api/meetings", json={"title": f"m{i}", "meeting_type": "retro" if i % 2 else "standup"})
+           .get_json()["meeting"]["id"] for i in range(5)]
+    client.post(f"/api/meetings/{ids[3]}/start")
+
+    page = client.get("/api/meetings?limit=2").get_json()
+    assert [m["id"] for m in page["meetings"]] == [ids[4], ids[3]]
+    page = client.get(f"/api/meetings?limit=2&before={page['next_cursor']}").get_json()
+    assert [m["id"] for m in page["meetings"]] == [ids[2], ids[1]]
+    page = client.get(f"/api/meetings?limit=2&before={page['next_cursor']}").get_json()
+    assert [m["id"] for m in page["meetings"]] == [ids[0]] and page["next_cursor"] is None
+
+    def listed(query):
+        return [m["id"] for m in client.get(f"/api/meetings?{query}").get_json()["meetings"]]
+    assert listed("status=in_progress") == [ids[3]]
+    assert listed("status=draft&meeting_type=retro") == [ids[1]]
+    assert listed("meeting_type=standup&limit=1") == [ids[4]]
+
+
+def test_sqlite_store_numbers_meetings_from_older_files(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE meetings (id TEXT PRIMARY KEY, created_at TEXT NOT NULL, status TEXT NOT NULL, "
+                 "ended_at TEXT, data TEXT NOT NULL)")
+    for mid in ("a", "b"):
+        conn.execute("INSERT INTO meetings VALUES (?, '', 'draft', NULL, ?)",
+                     (mid, json.dumps({"id": mid, "meeting_type": "retro"})))
+    conn.commit()
+    conn.close()
+    store = SQLiteMeetingStore(path)
+    store.create_meeting({"id": "c", "created_at": "", "status": "draft", "meeting_type": "retro"})
+    assert [m["id"] for _, m in store.list_meetings(meeting_type="retro")] == ["c", "b", "a"]
+
+
+def test_discuss_context_is_bounded_and_incremental(client, monkeypatch):
+    monkeypatch.setattr(paulis_place, "contexts", MeetingContexts(token_budget=120))
+    mid = client.post("/api/meetings", json={"title": "Long"}).get_json()["meeting"]["id"]
+    for i in range(40):
+        client.post(f"/api/meetings/{mid}/messages", json={"content": f"Point {i} is settled. Details follow."})
+
+    reads = []
+    get_messages = client.store.get_messages
+    monkeypatch.setattr(client.store, "get_messages",
+                        lambda *a, **kw: reads.append(get_messages(*a, **kw)) or reads[-1])
+    envelopes = []
+    monkeypatch.setattr(paulis_place, "discuss", lambda agents, make: (envelopes.append(make(agents[0])), ([], {}))[1])
+
+    for _ in range(2):
+        client.post(f"/api/meetings/{mid}/agent-discuss", json={"agents": ["alex"]})
+        client.post(f"/api/meetings/{mid}/messages", json={"content": "Next point."})
+    first, second = (e["payload"]["body"] for e in envelopes)
+    assert count_tokens(first) <= 130 and "Point 39 is settled. Details follow." in first
+    assert first.startswith("Earlier: ") and "Point 0" not in first
+    assert second.endswith("User: Next point.")
+    assert [len(r) for r in reads] == [41, 1]
+
+
+def test_batch_ingest_is_validated_then_atomic(client):
+    a, b = (client.post("/api/meetings", json={"title": t}).get_json()["meeting"]["id"] for t in "ab")
+
+    def envelope(meeting_id, agent, content):
+        return paulis_place._make_envelope(agent, "broadcast", "report", {"content": content}, meeting_id)
+
+    bad = client.post("/api/messages/batch", json=[envelope(a, "alex", "one"), envelope("nope", "alex", "two"),
+                                                    {"protocol": "other"}]).get_json()
+    assert [r["ok"] for r in bad["results"]] == [True, False, False]
+    assert client.store.count_messages(a) == 1
+
+    body = client.post("/api/messages/batch", json={"envelopes": [
+        envelope(a, "alex", "one"), envelope(b, "luna", "two"), envelope(a, "user", "three")]})
+    assert body.status_code == 201
+    results = body.get_json()["results"]
+    assert [(r["index"], r["meeting_id"]) for r in results] == [(0, a), (1, b), (2, a)]
+    msgs = client.get(f"/api/meetings/{a}/messages").get_json()["messages"]
+    assert [(m["agent_name"], m["content"]) for m in msgs[1:]] == [("Alex", "one"), ("User", "three")]
+    assert msgs[1]["id"] == results[0]["message_id"]
+
+
+def test_batch_ingest_rejects_malformed_envelopes_per_item(client):
+    mid = client.post("/api/meetings", json={"title": "a"}).get_json()["meeting"]["id"]
+    good = paulis_place._make_envelope("alex", "broadcast", "report", {"content": "hi"}, mid)
+    malformed = [{**good, "context": "abc"}, {**good, "context": {"session_id": ["x"]}},
+                 {**good, "from": "alex"}, {**good, "from": {"agent_id": 7}}, {**good, "payload": []},
+                 {**good, "payload": {"content": "hi", "message_type": {"x": 1}}}]
+    resp = client.post("/api/messages/batch", json=[good] + malformed)
+    assert resp.status_code == 400
+    results = resp.get_json()["results"]
+    assert [r["ok"] for r in results] == [True] + [False] * len(malformed)
+    assert [r["error"].split(" ")[0] for r in results[1:]] == [
+        "context", "context.session_id", "from", "from.agent_id", "payload", "payload.message_type"]
+    assert client.store.count_messages(mid) == 1
+
+
+def test_ended_meetings_are_archived_and_read_back(client, tmp_path, monkeypatch):
+    archive = MeetingArchive(str(tmp_path / "archive"), segment_bytes=400)
+    monkeypatch.setattr(paulis_place, "archive", archive)
+    ids = []
+    for title in ("first", "second"):
+        mid = client.post("/api/meetings", json={"title": title}).get_json()["meeting"]["id"]
+        for i in range(3):
+            client.post(f"/api/meetings/{mid}/messages", json={"content": f"{title} {i}"})
+        assert client.post(f"/api/meetings/{mid}/end").get_json()["meeting"]["archived_at"]
+        assert client.store.count_messages(mid) == 0
+        ids.append(mid)
+    assert len([n for n in os.listdir(tmp_path / "archive") if n.startswith("segment-")]) == 2
+
+    mid = ids[0]
+    client.post(f"/api/meetings/{mid}/messages", json={"content": "after"})
+    full = client.get(f"/api/meetings/{mid}/messages").get_json()
+    assert [m["content"] for m in full["messages"]][1:] == ["first 0", "first 1", "first 2",
+                                                            full["messages"][4]["content"], "after"]
+    assert full["next_cursor"] == full["messages"][-1]["id"]
+
+    page = client.get(f"/api/meetings/{mid}/messages?since_id={full['messages'][1]['id']}&limit=2").get_json()
+    assert [m["content"] for m in page["messages"]] == ["first 1", "first 2"] and page["has_more"]
+
+    # Still readable once retention has dropped the meeting from the live store.
+    monkeypatch.setattr(paulis_place, "store", MemoryMeetingStore())
+    assert client.get(f"/api/meetings/{ids[1]}").get_json()["meeting"]["title"] == "second"
+    assert len(client.get(f"/api/meetings/{ids[1]}/messages").get_json()["messages"]) == 5
+
+
+def test_ending_an_archived_meeting_again_keeps_its_transcript(client, tmp_path, monkeypatch):
+    archive = MeetingArchive(str(tmp_path / "archive"))
+    monkeypatch.setattr(paulis_place, "archive", archive)
+    mid = client.post("/api/meetings", json={"title": "twice"}).get_json()["meeting"]["id"]
+    client.post(f"/api/meetings/{mid}/messages", json={"content": "hello"})
+    client.post(f"/api/meetings/{mid}/end")
+    assert archive.message_count(mid) == 3
+    client.post(f"/api/meetings/{mid}/end")
+
+    msgs = client.get(f"/api/meetings/{mid}/messages").get_json()["messages"]
+    assert [m["content"] for m in msgs][1:3] == ["hello", "Meeting ended. 2 messages exchanged. Action items: 0"]
+    assert msgs[3]["content"].startswith("Meeting ended. 3 messages exchanged.") and len(msgs) == 4
+    assert archive.message_count(mid) == 3 and client.store.count_messages(mid) == 1
+    assert client.get(f"/api/meetings/{mid}/messages?since_id=nope").status_code == 400
+    assert client.get(f"/api/meetings/{mid}/messages?since_id=nope&limit=5").status_code == 400
+
+    # A reconnecting stream replays the archived transcript, then the live leftovers.
+    resp = client.get(f"/api/meetings/{mid}/stream", headers={"Last-Event-ID": msgs[0]["id"]}, buffered=False)
+    events = _events(resp.response, lambda e: e[1]["id"] == msgs[-1]["id"])
+    resp.close()
+    assert [d["id"] for _, d in events] == [m["id"] for m in msgs[1:]]
+
+
+def test_search_ranks_meeting_messages(client, monkeypatch):
+    monkeypatch.setattr(paulis_place, "search_index", SearchIndex())
+    first = client.post("/api/meetings", json={"title": "A"}).get_json()["meeting"]["id"]
+    second = client.post("/api/meetings", json={"title": "B"}).get_json()["meeting"]["id"]
+    client.post(f"/api/meetings/{first}/messages", json={"agent_id": "alex", "content": "Deploying the payments service"})
+    client.post(f"/api/meetings/{second}/messages", json={"agent_id": "luna", "content": "Payments deploy went fine"})
+
+    hits = client.get("/api/search?q=deploy payment").get_json()
+    assert {h["meeting_id"] for h in hits["results"]} == {first, second} and not hits["has_more"]
+    only = client.get(f"/api/search?q=deploy*&meeting_id={second}").get_json()["results"]
+    assert [h["agent_name"] for h in only] == ["Luna"] and "[deploy]" in only[0]["snippet"]
+
+    paulis_place.search_index.clear("meeting")
+    assert paulis_place.reindex_meetings() == 2
+    assert len(client.get("/api/search?q=payments&limit=1").get_json()["results"]) == 1
+
+    # Retention drops pruned meetings from the index too.
+    monkeypatch.setattr(client.store, "keep_ended", 1)
+    client.post(f"/api/meetings/{first}/end")
+    client.post(f"/api/meetings/{second}/end")
+    assert {h["meeting_id"] for h in client.get("/api/search?q=payments").get_json()["results"]} == {second}
+    monkeypatch.setattr(paulis_place, "search_index", None)
+    assert client.get("/api/search?q=payments").status_code == 503
@@ -0,0 +1,140 @@
+import io
+import json
+import os
+import wave
+
+import bench_tone
+import lipsync_service
+import tts_service
+from media_cache import MediaCache, cache_key
+
+
+def test_batched_tone_matches_per_sample_writer(tmp_path, monkeypatch):
+    text = "Hello from the fleet"
+    expected = tmp_path / "expected.wav"
+    bench_tone.per_sample_tone_wav(text, str(expected))
+    actual = tmp_path / "actual.wav"
+    tts_service.generate_tone_wav(text, str(actual))
+    assert actual.read_bytes() == expected.read_bytes()
+
+    buf = io.BytesIO()
+    tts_service.generate_tone_wav(text, buf)
+    assert buf.getvalue() == expected.read_bytes()
+
+    monkeypatch.setattr(tts_service, "np", None)
+    with wave.open(str(expected), "rb") as wav:
+        assert tts_service.tone_pcm(text) == wav.readframes(wav.getnframes())
+
+
+def test_serve_answers_json_lines_by_id(tmp_path):
+    class Recorder:
+        def synthesize(self, text, output_path, voice="en"):
+            if text == "boom":
+                raise RuntimeError("engine down")
+            tts_service.generate_tone_wav(text, output_path)
+            return f"tone-{voice}"
+
+    requests = [{"id": 1, "text": "hi", "output": str(tmp_path / "a" / "1.wav")},
+                {"id": 2, "text": "boom", "output": str(tmp_path / "2.wav")},
+                {"id": 3, "text": "yo", "voice": "de", "output": str(tmp_path / "3.wav")}]
+    lines = [json.dumps(r) + "\n" for r in requests] + ["not json\n"]
+    out = io.StringIO()
+    tts_service.serve(Recorder(), lines, out, workers=2)
+
+    replies = {r["id"]: r for r in map(json.loads, out.getvalue().splitlines())}
+    assert replies[1] == {"id": 1, "engine": "tone-en"} and (tmp_path / "a" / "1.wav").exists()
+    assert replies[2]["error"] == "RuntimeError: engine down"
+    assert replies[3]["engine"] == "tone-de" and replies[None]["error"].startswith("bad request")
+
+
+def test_media_cache_serves_repeats_and_evicts_lru(tmp_path):
+    cache = MediaCache(tmp_path, ".wav", max_bytes=2500)
+    synthesized = []
+
+    class Recorder:
+        engine = "fake"
+
+        def synthesize(self, text, output_path, voice="en"):
+            synthesized.append(text)
+            with open(output_path, "wb") as f:
+                f.write(b"x" * 1000)
+            return self.engine
+
+    lines = [json.dumps({"id": i, "text": t}) + "\n" for i, t in enumerate(["a", "b", "a"])]
+    out = io.StringIO()
+    tts_service.serve(Recorder(), lines, out, workers=1, cache=cache)
+    replies = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert synthesized == ["a", "b"] and [r["cached"] for r in replies] == [False, False, True]
+    assert replies[0]["key"] == replies[2]["key"] == cache_key("a", "en", "fake")
+
+    os.utime(cache.path(replies[1]["key"]), (1, 1))  # "b" is least recently used
+    cache.put("c", lambda tmp: open(tmp, "wb").write(b"y" * 1000))
+    assert cache.get(replies[1]["key"]) is None
+    assert cache.get(replies[0]["key"]) is not None and cache.get("c") is not None
+    assert not [p for p in tmp_path.iterdir() if p.name.startswith(".")]
+
+
+def test_fallback_audio_is_not_cached_as_the_preferred_engine(tmp_path):
+    cache = MediaCache(tmp_path, ".wav", max_bytes=10 ** 6)
+    used = iter(["tone-fallback", "coqui"])
+
+    class Flaky:
+        engine = "coqui"
+
+        def synthesize(self, text, output_path, voice="en"):
+            tts_service.generate_tone_wav(text, output_path)
+            return next(used)
+
+    lines = [json.dumps({"id": i, "text": "same line"}) + "\n" for i in range(3)]
+    out = io.StringIO()
+    tts_service.serve(Flaky(), lines, out, workers=1, cache=cache)
+    replies = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [(r["engine"], r["cached"]) for r in replies] == [("tone-fallback", False), ("coqui", False), ("coqui", True)]
+    assert replies[0]["key"] == cache_key("same line", "en", "tone-fallback")
+    assert replies[1]["key"] == replies[2]["key"] == cache_key("same line", "en", "coqui")
+
+
+def test_streamed_utterance_is_answered_a_sentence_at_a_time(tmp_path):
+    voices = MediaCache(tmp_path / "voices", ".wav", max_bytes=10 ** 6)
+    text = "First things first. Then the rest!  Done?"
+    assert tts_service.split_sentences(text) == ["First things first.", "Then the rest!", "Done?"]
+
+    out = io.StringIO()
+    tts_service.serve(tts_service.Synthesizer(), [json.dumps({"id": 7, "text": text, "stream": True}) + "\n"],
+                      out, cache=voices)
+    replies = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r.get("chunk") for r in replies] == [0, 1, 2, None] and replies[-1]["chunks"] == 3
+    assert replies[1]["text"] == "Then the rest!" and replies[1]["key"] == cache_key("Then the rest!", "en", replies[1]["engine"])
+
+    timelines = MediaCache(tmp_path / "lipsync", ".json", max_bytes=10 ** 6)
+    requests = [json.dumps({"id": r["chunk"], "key": r["key"], "audio": r["audio"], "text": r["text"]}) + "\n"
+                for r in replies[:-1]]
+    out = io.StringIO()
+    lipsync_service.serve(requests + requests[:1], out, workers=1, cache=timelines)
+    lipsync = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["cached"] for r in lipsync] == [False, False, False, True]
+    assert json.loads(open(lipsync[0]["lipsync"]).read()) == [{"time": 0.0, "mouth": "mouthRound"}]  # a 220 Hz tone
+
+
+def test_fallback_lipsync_follows_the_audio(tmp_path, monkeypatch):
+    np = tts_service.np
+    rate, seg = 16000, 4800  # 0.3 s segments
+    t = np.arange(seg) / rate
+    signal = np.concatenate([np.zeros(seg), 0.5 * np.sin(2 * np.pi * 200 * t),
+                             0.4 * np.sin(2 * np.pi * 3000 * t), np.zeros(seg)])
+    audio = tmp_path / "speech.wav"
+    with wave.open(str(audio), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes((signal * 32767).astype("<i2").tobytes())
+
+    output = tmp_path / "speech.json"
+    lipsync_service.fallback_generate("a very long line " * 50, str(audio), str(output))
+    assert json.loads(output.read_text()) == [
+        {"time": 0.0, "mouth": "mouthClosed"}, {"time": 0.3, "mouth": "mouthRound"},
+        {"time": 0.6, "mouth": "mouthWide"}, {"time": 0.9, "mouth": "mouthClosed"}]
+
+    monkeypatch.setattr(lipsync_service, "np", None)
+    lipsync_service.fallback_generate("Hi", str(audio), str(output))
+    assert json.loads(output.read_text()) == [{"time": 0.0, "mouth": "mouthOpen"}, {"time": 0.6, "mouth": "mouthWide"}]